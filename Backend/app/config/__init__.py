@@ -1,4 +1,15 @@
-"""Configuration package"""
+"""
+Configuration package
+
+Collections exported here are lazy handles: importing them opens no
+connection. The Motor client is created per worker process, by
+Database.initialize() in the app lifespan or on first use, so it is
+safe under uvicorn --workers / gunicorn. Code outside a request can
+also fetch a collection explicitly:
+
+    from app.config import Database
+    users = Database.get_collection("users")
+"""
 
 from .settings import settings, get_settings
 from .database import (
@@ -3,59 +3,181 @@ Database module
 MongoDB connection and collections management
 """
 
+import asyncio
+import os
 import motor.motor_asyncio
-from typing import Any
+from typing import Any, Dict, Optional
 import logging
 
 from .settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Hot collections touched during pool warm-up
+WARM_COLLECTIONS = ("users", "Sensor_Data", "alerts", "alert_history")
+
+# Indexes ensured at startup: (collection, keys, options)
+# Names match scripts/create_indexes.py where both define the same index
+INDEXES = (
+    ("users", [("email", 1)], {"name": "idx_email_unique", "unique": True}),
+    ("Sensor_Data", [("reservoirId", 1), ("ReadTime", -1)], {"name": "idx_reservoir_time"}),
+    ("reset_tokens", [("token", 1)], {"name": "idx_reset_token", "unique": True}),
+    ("reset_tokens", [("expires_at", 1)], {"name": "idx_reset_token_ttl", "expireAfterSeconds": 0}),
+    ("notifications_sent", [("key", 1), ("sent_at", -1)], {"name": "idx_notification_key_sent"}),
+    ("notifications_sent", [("sent_at", 1)], {"name": "idx_notification_sent_ttl", "expireAfterSeconds": 604800}),
+    # Alert reads filter on one field and sort by created_at desc; with the
+    # sort key in the index Mongo walks it in order and stops at the limit
+    ("alerts", [("is_resolved", 1), ("created_at", -1)], {"name": "idx_alerts_resolved_created"}),
+    ("alerts", [("sensor_id", 1), ("created_at", -1)], {"name": "idx_alerts_sensor_created"}),
+    ("alerts", [("level", 1), ("created_at", -1)], {"name": "idx_alerts_level_created"}),
+    ("alert_history", [("created_at", -1)], {"name": "idx_history_created"}),
+    # /api/alerts/history lists the most recently dismissed first
+    ("alert_history", [("dismissed_at", -1)], {"name": "idx_history_dismissed"}),
+)
+
 
 class Database:
     """MongoDB database manager"""
-    
+
     client: Any = None
     db: Any = None
-    
+    # Process that created the client; a forked worker must not reuse the parent's pool
+    _pid: Optional[int] = None
+
     @classmethod
-    async def initialize(cls) -> None:
-        """Initialize database connection"""
+    async def initialize(cls) -> Any:
+        """Initialize database connection (idempotent per process)"""
+        cls._discard_if_forked()
+        if cls.client is not None:
+            return cls.client
         try:
-            cls.client = motor.motor_asyncio.AsyncIOMotorClient(
-                settings.MONGO_CONNECTION_STRING,
-                serverSelectionTimeoutMS=5000
-            )
-            cls.db = cls.client[settings.DATABASE_NAME]
-            
+            # Bind to the loop serving the app so Motor never picks up a stale one
+            cls._connect(io_loop=asyncio.get_running_loop())
             await cls.client.admin.command('ping')
+            await cls._warm_pool()
             logger.info(f"Connected to MongoDB: {settings.DATABASE_NAME}")
             return cls.client
         except Exception as e:
             logger.error(f"Failed to connect to MongoDB: {e}")
             raise
-    
+
+    @classmethod
+    def _connect(cls, io_loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Create the shared client; Motor defers real I/O until first operation"""
+        options: Dict[str, Any] = {
+            "serverSelectionTimeoutMS": 5000,
+            "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+            "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+            "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+            "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+            "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            "retryWrites": True,
+            # Drivers negotiate the first compressor the server also supports
+            "compressors": settings.MONGO_COMPRESSORS,
+            "zlibCompressionLevel": settings.MONGO_ZLIB_COMPRESSION_LEVEL,
+        }
+        if io_loop is not None:
+            options["io_loop"] = io_loop
+        cls.client = motor.motor_asyncio.AsyncIOMotorClient(
+            settings.MONGO_CONNECTION_STRING,
+            **options
+        )
+        cls.db = cls.client[settings.DATABASE_NAME]
+        cls._pid = os.getpid()
+
+    @classmethod
+    def _discard_if_forked(cls) -> None:
+        """
+        Drop a client inherited across fork (uvicorn --workers / gunicorn)
+        Its sockets and monitor threads belong to the parent, so the child
+        builds its own on next use instead of hanging on the copied pool
+        """
+        if cls.client is not None and cls._pid != os.getpid():
+            cls.client = None
+            cls.db = None
+
+    @classmethod
+    async def _warm_pool(cls) -> None:
+        """Open pooled sockets up front so the first requests skip the handshakes"""
+        results = await asyncio.gather(
+            *(cls.db[name].estimated_document_count() for name in WARM_COLLECTIONS),
+            return_exceptions=True
+        )
+        for name, result in zip(WARM_COLLECTIONS, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Pool warm-up failed for {name}: {result}")
+
+    @classmethod
+    async def ensure_indexes(cls) -> None:
+        """
+        Create the indexes hot queries rely on
+        create_index is a no-op for existing indexes; failures (e.g. duplicate
+        data under a unique key) are logged so startup can continue
+        """
+        db = cls.get_database()
+        results = await asyncio.gather(
+            *(db[name].create_index(keys, **options) for name, keys, options in INDEXES),
+            return_exceptions=True
+        )
+        for (name, _, options), result in zip(INDEXES, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Could not ensure index {options['name']} on {name}: {result}")
+
     @classmethod
     async def close(cls) -> None:
         """Close database connection"""
         if cls.client:
             cls.client.close()
+            cls.client = None
+            cls.db = None
             logger.info("MongoDB connection closed")
-    
+
+    @classmethod
+    def get_database(cls) -> Any:
+        """Get the database, lazily creating the shared client if needed"""
+        cls._discard_if_forked()
+        if cls.db is None:
+            cls._connect()
+        return cls.db
+
     @classmethod
     def get_collection(cls, name: str) -> Any:
         """Get a collection from the database"""
-        if cls.db is None:
-            raise RuntimeError("Database not initialized. Call Database.initialize() first")
-        return cls.db[name]
+        return cls.get_database()[name]
 
 
-# MongoDB client instance
-db_client = motor.motor_asyncio.AsyncIOMotorClient(
-    settings.MONGO_CONNECTION_STRING,
-    serverSelectionTimeoutMS=5000
-)
-db = db_client[settings.DATABASE_NAME]
+class _CollectionProxy:
+    """
+    Lazy handle to a collection of the shared client
+    Resolved on attribute access so importing it never opens a connection
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        return getattr(Database.get_collection(self._name), attr)
+
+    def __repr__(self) -> str:
+        return f"<lazy collection {self._name!r}>"
+
+
+class _DatabaseProxy:
+    """Lazy handle to the application database"""
+
+    def __getitem__(self, name: str) -> _CollectionProxy:
+        return _CollectionProxy(name)
+
+    def get_collection(self, name: str) -> _CollectionProxy:
+        return _CollectionProxy(name)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(Database.get_database(), attr)
+
+
+db = _DatabaseProxy()
 
 # Collections
 users_collection = db["users"]
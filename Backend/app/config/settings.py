@@ -3,8 +3,8 @@ Configuration module
 Centralized settings and environment variables management
 """
 
-from pydantic_settings import BaseSettings
-from typing import Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Any, Optional
 from functools import lru_cache
 
 
@@ -14,9 +14,24 @@ class Settings(BaseSettings):
     All sensitive data should be in .env file
     """
     
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=True,
+        extra="ignore",
+        frozen=True
+    )
+    
     # Database Configuration
     MONGO_CONNECTION_STRING: str
     DATABASE_NAME: str
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 10
+    MONGO_MAX_IDLE_TIME_MS: int = 300000
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 10000
+    MONGO_CONNECT_TIMEOUT_MS: int = 10000
+    MONGO_COMPRESSORS: str = "zstd,zlib"
+    MONGO_ZLIB_COMPRESSION_LEVEL: int = 6
     
     # Security & JWT
     SECRET_KEY: str
@@ -45,12 +60,6 @@ class Settings(BaseSettings):
     TWILIO_AUTH_TOKEN: Optional[str] = None
     TWILIO_WHATSAPP_FROM: Optional[str] = None
     
-    # Twilio WhatsApp Notifications
-    TWILIO_WHATSAPP_ENABLED: bool = False
-    TWILIO_ACCOUNT_SID: Optional[str] = None
-    TWILIO_AUTH_TOKEN: Optional[str] = None
-    TWILIO_WHATSAPP_FROM: Optional[str] = None
-    
     # AWS IoT Core Configuration
     AWS_IOT_ENDPOINT: Optional[str] = None
     AWS_REGION: Optional[str] = None
@@ -60,12 +69,6 @@ class Settings(BaseSettings):
     AWS_IOT_TOPIC: Optional[str] = None
     AWS_IOT_CLIENT_ID: Optional[str] = None
 
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = True
-        extra = "ignore"
-
 
 @lru_cache()
 def get_settings() -> Settings:
@@ -76,5 +79,20 @@ def get_settings() -> Settings:
     return Settings()  # type: ignore
 
 
+class _LazySettings:
+    """
+    Stand-in for the settings instance
+    Defers reading .env and validating until an attribute is first used
+    """
+    
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(get_settings(), name)
+    
+    def __repr__(self) -> str:
+        return repr(get_settings())
+
+
 # Export settings instance
-settings = get_settings()
+settings: Settings = _LazySettings()  # type: ignore[assignment]
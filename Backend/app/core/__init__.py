@@ -32,6 +32,7 @@ from .exceptions import (
 from .container import (
     Container,
     get_container,
+    reset_container,
     configure_container,
     get_alert_service,
     get_sensor_service,
@@ -73,6 +74,7 @@ __all__ = [
     # Container
     "Container",
     "get_container",
+    "reset_container",
     "configure_container",
     "get_alert_service",
     "get_sensor_service",
@@ -5,9 +5,18 @@ This allows for easy testing and swapping implementations
 """
 
 from typing import TypeVar, Type, Optional, Dict, Any, Callable
-from functools import lru_cache
 import logging
 
+from app.core.interfaces import (
+    IAlertRepository,
+    ISensorRepository,
+    IUserRepository,
+    IAlertService,
+    ISensorService,
+    INotificationService,
+    ICacheService
+)
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
@@ -28,23 +37,13 @@ class Container:
         alert_service = container.resolve(IAlertService)
     """
     
-    _instance: Optional['Container'] = None
-    
-    def __new__(cls) -> 'Container':
-        """Ensure singleton container instance"""
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
-    
     def __init__(self):
-        if self._initialized:
-            return
-        
+        # Keyed by the interface class itself: classes hash by identity, so a
+        # lookup is already a pointer hash; string keys would add nothing
         self._singletons: Dict[Type, Any] = {}
         self._singleton_factories: Dict[Type, Callable] = {}
         self._transient_factories: Dict[Type, Callable] = {}
-        self._initialized = True
+        self._frozen = False
         logger.debug("Dependency container initialized")
     
     def register_singleton(
@@ -68,6 +67,7 @@ class Container:
         Returns:
             Container for method chaining
         """
+        self._check_not_frozen(interface)
         if instance is not None:
             self._singletons[interface] = instance
         elif factory is not None:
@@ -99,6 +99,7 @@ class Container:
         Returns:
             Container for method chaining
         """
+        self._check_not_frozen(interface)
         if factory is not None:
             self._transient_factories[interface] = factory
         elif implementation is not None:
@@ -122,24 +123,58 @@ class Container:
         Raises:
             KeyError: If interface is not registered
         """
-        # Check pre-created singletons first
-        if interface in self._singletons:
+        # Hits dominate once singletons are built, so let the lookup raise
+        try:
             return self._singletons[interface]
+        except KeyError:
+            pass
         
-        # Check singleton factories
-        if interface in self._singleton_factories:
-            factory = self._singleton_factories[interface]
-            instance = factory() if callable(factory) else factory
+        # Build a singleton on first use; its factory is no longer needed after
+        factory = self._singleton_factories.get(interface)
+        if factory is not None:
+            instance = factory()
             self._singletons[interface] = instance
+            del self._singleton_factories[interface]
             return instance
         
         # Check transient factories
-        if interface in self._transient_factories:
-            factory = self._transient_factories[interface]
-            return factory() if callable(factory) else factory
+        factory = self._transient_factories.get(interface)
+        if factory is not None:
+            return factory()
         
         raise KeyError(f"No registration found for {interface.__name__}")
     
+    def resolve_singletons(self) -> None:
+        """
+        Instantiate every registered singleton up front
+        
+        Called once at startup so request-time resolution is a single
+        dictionary hit instead of running factories lazily
+        """
+        for interface in list(self._singleton_factories):
+            self.resolve(interface)
+    
+    def freeze(self) -> None:
+        """
+        Lock the registrations once the application is configured
+        
+        Any later register_* call raises, so request handling can never
+        silently rewire a dependency. override() stays available for tests.
+        """
+        self._frozen = True
+        logger.debug("Container frozen")
+    
+    @property
+    def is_frozen(self) -> bool:
+        """Whether registrations are locked"""
+        return self._frozen
+    
+    def _check_not_frozen(self, interface: Type) -> None:
+        if self._frozen:
+            raise RuntimeError(
+                f"Cannot register {interface.__name__}: container is frozen"
+            )
+    
     def is_registered(self, interface: Type) -> bool:
         """Check if an interface is registered"""
         return (
@@ -157,6 +192,7 @@ class Container:
         self._singletons.clear()
         self._singleton_factories.clear()
         self._transient_factories.clear()
+        self._frozen = False
         logger.debug("Container reset")
     
     def override(self, interface: Type[T], instance: T) -> 'Container':
@@ -182,17 +218,36 @@ class Container:
         return self
 
 
-@lru_cache(maxsize=1)
+_container: Optional[Container] = None
+
+
 def get_container() -> Container:
     """
     Get the singleton container instance
     
-    This function is cached to ensure same container is returned
+    Created on first call and held in a module global, so every later
+    call (one per request through the FastAPI helpers) is a plain read
     
     Returns:
         The application container instance
     """
-    return Container()
+    global _container
+    if _container is None:
+        _container = Container()
+    return _container
+
+
+def reset_container() -> None:
+    """
+    Discard the application container
+    
+    Useful for testing: the next get_container() call returns a fresh,
+    unconfigured instance instead of one holding a previous test's singletons
+    """
+    global _container
+    if _container is not None:
+        _container.reset()
+    _container = None
 
 
 def configure_container(container: Container) -> Container:
@@ -208,7 +263,10 @@ def configure_container(container: Container) -> Container:
     Returns:
         Configured container
     """
-    # Import implementations
+    if container.is_frozen:
+        return container
+    
+    # Import implementations (kept local so importing app.core does not load every service)
     from app.repositories.alert_repository import AlertRepository
     from app.repositories.sensor_repository import SensorRepository
     from app.repositories.user_repository import UserRepository
@@ -217,17 +275,6 @@ def configure_container(container: Container) -> Container:
     from app.services.notification_service import NotificationService
     from app.services.cache import CacheService
     
-    # Import interfaces
-    from app.core.interfaces import (
-        IAlertRepository,
-        ISensorRepository,
-        IUserRepository,
-        IAlertService,
-        ISensorService,
-        INotificationService,
-        ICacheService
-    )
-    
     # Register repositories (singletons)
     container.register_singleton(IAlertRepository, factory=AlertRepository)
     container.register_singleton(ISensorRepository, factory=SensorRepository)
@@ -254,6 +301,9 @@ def configure_container(container: Container) -> Container:
         )
     )
     
+    container.resolve_singletons()
+    container.freeze()
+    
     logger.info("Dependency container configured successfully")
     return container
 
@@ -261,23 +311,19 @@ def configure_container(container: Container) -> Container:
 # FastAPI dependency injection helpers
 def get_alert_service() -> 'AlertService':
     """FastAPI dependency for AlertService"""
-    from app.core.interfaces import IAlertService
     return get_container().resolve(IAlertService)
 
 
 def get_sensor_service() -> 'SensorService':
     """FastAPI dependency for SensorService"""
-    from app.core.interfaces import ISensorService
     return get_container().resolve(ISensorService)
 
 
 def get_notification_service() -> 'NotificationService':
     """FastAPI dependency for NotificationService"""
-    from app.core.interfaces import INotificationService
     return get_container().resolve(INotificationService)
 
 
 def get_cache_service() -> 'CacheService':
     """FastAPI dependency for CacheService"""
-    from app.core.interfaces import ICacheService
     return get_container().resolve(ICacheService)
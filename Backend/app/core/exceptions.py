@@ -6,6 +6,8 @@ Following Single Responsibility Principle - each exception type handles specific
 
 from typing import Optional, Dict, Any
 
+import orjson
+
 
 class AppException(Exception):
     """
@@ -13,6 +15,8 @@ class AppException(Exception):
     All custom exceptions should inherit from this
     """
     
+    __slots__ = ("message", "code", "status_code", "details", "_payload", "_body")
+    
     def __init__(
         self,
         message: str,
@@ -23,18 +27,48 @@ class AppException(Exception):
         self.message = message
         self.code = code
         self.status_code = status_code
-        self.details = details or {}
-        super().__init__(self.message)
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert exception to dictionary for API responses"""
-        return {
+        # Subclasses hand over a dict they own, so no defensive copy here
+        self.details = details if details is not None else {}
+        # Fields are fixed at construction, so the response body is built once
+        self._payload = {
             "error": {
                 "code": self.code,
                 "message": self.message,
                 "details": self.details
             }
         }
+        self._body: Optional[bytes] = None
+        super().__init__(self.message)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert exception to dictionary for API responses"""
+        return self._payload
+    
+    def to_json_bytes(self) -> bytes:
+        """Encoded to_dict() payload, cached so a re-raised instance is encoded once"""
+        if self._body is None:
+            self._body = orjson.dumps(self._payload)
+        return self._body
+    
+    def __reduce__(self):
+        """Slots are not part of the default exception state, so rebuild explicitly"""
+        return (
+            _rebuild_exception,
+            (type(self), self.message, self.code, self.status_code, self.details)
+        )
+
+
+def _rebuild_exception(
+    cls: type,
+    message: str,
+    code: str,
+    status_code: int,
+    details: Dict[str, Any]
+) -> AppException:
+    """Recreate a pickled/copied exception without re-running subclass __init__"""
+    exc = cls.__new__(cls)
+    AppException.__init__(exc, message, code, status_code, details)
+    return exc
 
 
 class NotFoundException(AppException):
@@ -43,6 +77,8 @@ class NotFoundException(AppException):
     Used when a requested resource doesn't exist
     """
     
+    __slots__ = ()
+    
     def __init__(
         self,
         resource: str,
@@ -54,7 +90,7 @@ class NotFoundException(AppException):
             message=message,
             code="NOT_FOUND",
             status_code=404,
-            details=details or {"resource": resource, "identifier": identifier}
+            details=details if details is not None else {"resource": resource, "identifier": identifier}
         )
 
 
@@ -64,13 +100,16 @@ class ValidationException(AppException):
     Used when input data fails validation
     """
     
+    __slots__ = ()
+    
     def __init__(
         self,
         message: str,
         field: Optional[str] = None,
         details: Optional[Dict[str, Any]] = None
     ):
-        error_details = details or {}
+        # Copy so the extra keys never leak into the caller's dict
+        error_details = dict(details) if details else {}
         if field:
             error_details["field"] = field
         
@@ -88,6 +127,8 @@ class AuthenticationException(AppException):
     Used when authentication fails (invalid credentials, expired token, etc)
     """
     
+    __slots__ = ()
+    
     def __init__(
         self,
         message: str = "Authentication failed",
@@ -97,7 +138,7 @@ class AuthenticationException(AppException):
             message=message,
             code="AUTHENTICATION_ERROR",
             status_code=401,
-            details=details or {}
+            details=details
         )
 
 
@@ -107,13 +148,15 @@ class AuthorizationException(AppException):
     Used when user lacks permission for an action
     """
     
+    __slots__ = ()
+    
     def __init__(
         self,
         message: str = "Permission denied",
         required_role: Optional[str] = None,
         details: Optional[Dict[str, Any]] = None
     ):
-        error_details = details or {}
+        error_details = dict(details) if details else {}
         if required_role:
             error_details["required_role"] = required_role
         
@@ -131,6 +174,8 @@ class ServiceException(AppException):
     Used when a service operation fails
     """
     
+    __slots__ = ()
+    
     def __init__(
         self,
         service: str,
@@ -138,7 +183,7 @@ class ServiceException(AppException):
         message: str,
         details: Optional[Dict[str, Any]] = None
     ):
-        error_details = details or {}
+        error_details = dict(details) if details else {}
         error_details["service"] = service
         error_details["operation"] = operation
         
@@ -156,6 +201,8 @@ class RepositoryException(AppException):
     Used when a database operation fails
     """
     
+    __slots__ = ()
+    
     def __init__(
         self,
         repository: str,
@@ -163,7 +210,7 @@ class RepositoryException(AppException):
         message: str,
         details: Optional[Dict[str, Any]] = None
     ):
-        error_details = details or {}
+        error_details = dict(details) if details else {}
         error_details["repository"] = repository
         error_details["operation"] = operation
         
@@ -181,13 +228,15 @@ class RateLimitException(AppException):
     Used when user exceeds API rate limits
     """
     
+    __slots__ = ()
+    
     def __init__(
         self,
         message: str = "Rate limit exceeded",
         retry_after: Optional[int] = None,
         details: Optional[Dict[str, Any]] = None
     ):
-        error_details = details or {}
+        error_details = dict(details) if details else {}
         if retry_after:
             error_details["retry_after_seconds"] = retry_after
         
@@ -205,13 +254,15 @@ class ExternalServiceException(AppException):
     Used when an external service (Twilio, email, etc) fails
     """
     
+    __slots__ = ()
+    
     def __init__(
         self,
         service_name: str,
         message: str,
         details: Optional[Dict[str, Any]] = None
     ):
-        error_details = details or {}
+        error_details = dict(details) if details else {}
         error_details["external_service"] = service_name
         
         super().__init__(
@@ -228,13 +279,15 @@ class SensorException(AppException):
     Used for sensor-specific errors
     """
     
+    __slots__ = ()
+    
     def __init__(
         self,
         sensor_id: str,
         message: str,
         details: Optional[Dict[str, Any]] = None
     ):
-        error_details = details or {}
+        error_details = dict(details) if details else {}
         error_details["sensor_id"] = sensor_id
         
         super().__init__(
@@ -251,13 +304,15 @@ class AlertException(AppException):
     Used for alert-specific errors
     """
     
+    __slots__ = ()
+    
     def __init__(
         self,
         alert_id: Optional[str],
         message: str,
         details: Optional[Dict[str, Any]] = None
     ):
-        error_details = details or {}
+        error_details = dict(details) if details else {}
         if alert_id:
             error_details["alert_id"] = alert_id
         
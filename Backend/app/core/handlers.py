@@ -5,151 +5,189 @@ Ensures consistent error responses across the application
 """
 
 from fastapi import Request, FastAPI
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
+from functools import lru_cache
+from typing import Dict, List, Tuple
 import logging
+import time
+import orjson
 
-from app.core.exceptions import (
-    AppException,
-    NotFoundException,
-    ValidationException,
-    AuthenticationException,
-    AuthorizationException,
-    ServiceException,
-    RepositoryException,
-    RateLimitException
-)
+from app.core.exceptions import AppException
 
 logger = logging.getLogger(__name__)
 
+# Bound once; levels are still checked on every call
+_warn = logger.warning
+_info = logger.info
+_exception = logger.exception
+_error = logger.error
 
-def register_exception_handlers(app: FastAPI) -> None:
+# Unhandled exceptions: full tracebacks for the first few of a kind per
+# window, one-line summaries after that
+_REPEAT_WINDOW_SECONDS = 60
+_REPEAT_TRACEBACK_LIMIT = 10
+_REPEAT_MAX_KEYS = 256
+_repeat_counts: Dict[Tuple[str, str], List[float]] = {}
+
+# The 500 body never varies, so it is encoded once
+_INTERNAL_ERROR_BODY = orjson.dumps({
+    "error": {
+        "code": "INTERNAL_ERROR",
+        "message": "An unexpected error occurred",
+        "details": {}
+    }
+})
+
+
+@lru_cache(maxsize=128)
+def _http_error_body(status_code: int, message: str) -> bytes:
+    """Encoded envelope for an HTTP error; a handful of (status, detail) pairs repeat"""
+    return orjson.dumps({
+        "error": {
+            "code": f"HTTP_{status_code}",
+            "message": message,
+            "details": {}
+        }
+    })
+
+
+# Log level and message for the statuses AppException subclasses use;
+# anything else is logged as a generic warning with its code
+_LOG_BY_STATUS = {
+    401: (_warn, "Authentication failed: %s"),
+    403: (_warn, "Authorization denied: %s"),
+    404: (_info, "Resource not found: %s"),
+    422: (_info, "Validation error: %s"),
+    429: (_info, "Rate limit exceeded: %s"),
+}
+
+_WWW_AUTHENTICATE = {"WWW-Authenticate": "Bearer"}
+
+
+async def app_exception_handler(request: Request, exc: AppException) -> Response:
     """
-    Register all exception handlers with the FastAPI application
+    Handle all application-specific exceptions
     
-    Args:
-        app: FastAPI application instance
+    One handler for every AppException subclass; the status code selects
+    the log level and any extra headers (401 challenge, 429 Retry-After)
     """
+    status_code = exc.status_code
+    extra = {"details": exc.details, "path": request.url.path}
+    entry = _LOG_BY_STATUS.get(status_code)
+    if entry is None:
+        _warn("AppException: %s - %s", exc.code, exc.message, extra=extra)
+    else:
+        log, template = entry
+        log(template, exc.message, extra=extra)
     
-    @app.exception_handler(AppException)
-    async def app_exception_handler(request: Request, exc: AppException) -> JSONResponse:
-        """Handle all application-specific exceptions"""
-        logger.warning(
-            f"AppException: {exc.code} - {exc.message}",
-            extra={"details": exc.details, "path": request.url.path}
-        )
-        return JSONResponse(
-            status_code=exc.status_code,
-            content=exc.to_dict()
-        )
-    
-    @app.exception_handler(NotFoundException)
-    async def not_found_handler(request: Request, exc: NotFoundException) -> JSONResponse:
-        """Handle not found exceptions"""
-        logger.info(f"Resource not found: {exc.message}", extra={"path": request.url.path})
-        return JSONResponse(
-            status_code=404,
-            content=exc.to_dict()
-        )
-    
-    @app.exception_handler(ValidationException)
-    async def validation_exception_handler(request: Request, exc: ValidationException) -> JSONResponse:
-        """Handle validation exceptions"""
-        logger.info(f"Validation error: {exc.message}", extra={"details": exc.details})
-        return JSONResponse(
-            status_code=422,
-            content=exc.to_dict()
-        )
-    
-    @app.exception_handler(AuthenticationException)
-    async def auth_exception_handler(request: Request, exc: AuthenticationException) -> JSONResponse:
-        """Handle authentication exceptions"""
-        logger.warning(f"Authentication failed: {exc.message}", extra={"path": request.url.path})
-        return JSONResponse(
-            status_code=401,
-            content=exc.to_dict(),
-            headers={"WWW-Authenticate": "Bearer"}
-        )
-    
-    @app.exception_handler(AuthorizationException)
-    async def authz_exception_handler(request: Request, exc: AuthorizationException) -> JSONResponse:
-        """Handle authorization exceptions"""
-        logger.warning(f"Authorization denied: {exc.message}", extra={"path": request.url.path})
-        return JSONResponse(
-            status_code=403,
-            content=exc.to_dict()
-        )
+    headers = None
+    if status_code == 401:
+        headers = _WWW_AUTHENTICATE
+    elif status_code == 429:
+        retry_after = exc.details.get("retry_after_seconds")
+        if retry_after is not None:
+            headers = {"Retry-After": str(retry_after)}
     
-    @app.exception_handler(RateLimitException)
-    async def rate_limit_handler(request: Request, exc: RateLimitException) -> JSONResponse:
-        """Handle rate limit exceptions"""
-        logger.info(f"Rate limit exceeded: {request.client.host if request.client else 'unknown'}")
-        response = JSONResponse(
-            status_code=429,
-            content=exc.to_dict()
+    return Response(
+        content=exc.to_json_bytes(),
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers
+    )
+
+
+async def pydantic_validation_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
+    """Handle Pydantic validation errors"""
+    # Only field/message/type go out: pydantic v2's input/ctx/url extras are
+    # noise for clients, and ctx may hold exception objects. New dicts, not
+    # the originals reshaped in place: errors() returns the exception's own
+    # list, which later handlers and loggers still read
+    join = ".".join
+    errors = [
+        {"field": join(map(str, e["loc"])), "message": e["msg"], "type": e["type"]}
+        for e in exc.errors()
+    ]
+
+    if logger.isEnabledFor(logging.INFO):
+        _info(
+            "Request validation error (%d fields)", len(errors),
+            extra={"errors": errors, "path": request.url.path}
         )
-        if "retry_after_seconds" in exc.details:
-            response.headers["Retry-After"] = str(exc.details["retry_after_seconds"])
-        return response
-    
-    @app.exception_handler(RequestValidationError)
-    async def pydantic_validation_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
-        """Handle Pydantic validation errors"""
-        errors = []
-        for error in exc.errors():
-            errors.append({
-                "field": ".".join(str(loc) for loc in error["loc"]),
-                "message": error["msg"],
-                "type": error["type"]
-            })
-        
-        logger.info(f"Request validation error: {errors}", extra={"path": request.url.path})
-        return JSONResponse(
-            status_code=422,
-            content={
-                "error": {
-                    "code": "VALIDATION_ERROR",
-                    "message": "Request validation failed",
-                    "details": {"errors": errors}
-                }
+    return ORJSONResponse(
+        status_code=422,
+        content={
+            "error": {
+                "code": "VALIDATION_ERROR",
+                "message": "Request validation failed",
+                "details": {"errors": errors}
             }
-        )
-    
-    @app.exception_handler(StarletteHTTPException)
-    async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> JSONResponse:
-        """Handle standard HTTP exceptions"""
-        logger.warning(
-            f"HTTP error {exc.status_code}: {exc.detail}",
+        }
+    )
+
+
+async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> Response:
+    """Handle standard HTTP exceptions"""
+    _warn(
+        "HTTP error %s: %s", exc.status_code, exc.detail,
+        extra={"path": request.url.path}
+    )
+    return Response(
+        content=_http_error_body(exc.status_code, str(exc.detail)),
+        status_code=exc.status_code,
+        media_type="application/json"
+    )
+
+
+def _count_repeat(exc: Exception) -> int:
+    """Occurrences of this exception type/message in the current window"""
+    key = (type(exc).__name__, str(exc)[:80])
+    now = time.monotonic()
+    entry = _repeat_counts.get(key)
+    if entry is None or now - entry[0] > _REPEAT_WINDOW_SECONDS:
+        if entry is None and len(_repeat_counts) >= _REPEAT_MAX_KEYS:
+            _repeat_counts.clear()
+        _repeat_counts[key] = [now, 1]
+        return 1
+    entry[1] += 1
+    return int(entry[1])
+
+
+async def general_exception_handler(request: Request, exc: Exception) -> Response:
+    """Handle any uncaught exceptions"""
+    count = _count_repeat(exc)
+    if count <= _REPEAT_TRACEBACK_LIMIT:
+        _exception(
+            "Unhandled exception: %s: %s", type(exc).__name__, exc,
             extra={"path": request.url.path}
         )
-        return JSONResponse(
-            status_code=exc.status_code,
-            content={
-                "error": {
-                    "code": f"HTTP_{exc.status_code}",
-                    "message": str(exc.detail),
-                    "details": {}
-                }
-            }
-        )
-    
-    @app.exception_handler(Exception)
-    async def general_exception_handler(request: Request, exc: Exception) -> JSONResponse:
-        """Handle any uncaught exceptions"""
-        logger.exception(
-            f"Unhandled exception: {type(exc).__name__}: {exc}",
+    else:
+        # Formatting a traceback per request is what makes error floods expensive
+        _error(
+            "Repeated exception %s (%d in %ds)", type(exc).__name__, count, _REPEAT_WINDOW_SECONDS,
             extra={"path": request.url.path}
         )
-        return JSONResponse(
-            status_code=500,
-            content={
-                "error": {
-                    "code": "INTERNAL_ERROR",
-                    "message": "An unexpected error occurred",
-                    "details": {}
-                }
-            }
-        )
+    return Response(
+        content=_INTERNAL_ERROR_BODY,
+        status_code=500,
+        media_type="application/json"
+    )
+
+
+def register_exception_handlers(app: FastAPI) -> None:
+    """
+    Register all exception handlers with the FastAPI application
+    
+    Error bodies are encoded with orjson (AppException bodies are cached on
+    the instance), which keeps 4xx-heavy traffic such as rate limiting cheap
+    
+    Args:
+        app: FastAPI application instance
+    """
+    app.add_exception_handler(AppException, app_exception_handler)
+    app.add_exception_handler(RequestValidationError, pydantic_validation_handler)
+    app.add_exception_handler(StarletteHTTPException, http_exception_handler)
+    app.add_exception_handler(Exception, general_exception_handler)
     
     logger.info("Exception handlers registered")
@@ -6,30 +6,121 @@ Each validator class handles validation for a specific domain
 
 from typing import Dict, Any, Optional, List
 from datetime import datetime
+import math
 import re
+import string
 import logging
 
 from app.core.exceptions import ValidationException
 
+try:
+    import re2  # type: ignore
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+    re2 = None  # type: ignore
+
 logger = logging.getLogger(__name__)
 
+# RE2 (linear-time DFA) when google-re2 is installed, stdlib re otherwise
+_regex = re2 if RE2_AVAILABLE else re
+
+# Compiled once at import instead of going through re's pattern cache per call
+_EMAIL_RE = _regex.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_PHONE_STRIP_RE = _regex.compile(r'[\s\-]')
+_PHONE_RE = _regex.compile(r'^\+\d{10,15}$')
+_SENSOR_ID_RE = _regex.compile(r'^[A-Za-z0-9_-]+$')
+
+# Allowed values: ordered tuples for messages, frozensets for membership
+_ALERT_LEVELS = ('info', 'warning', 'critical')
+_ALERT_TYPES = (
+    'ph', 'temperature', 'ec', 'conductivity',
+    'water_level', 'sensor_disconnection', 'system'
+)
+_USER_ROLES = ('admin', 'operario', 'viewer')
+
+_VALID_LEVELS = frozenset(_ALERT_LEVELS)
+_VALID_LEVELS_MSG = ", ".join(_ALERT_LEVELS)
+_VALID_TYPES = frozenset(_ALERT_TYPES)
+_VALID_TYPES_MSG = ", ".join(_ALERT_TYPES)
+_VALID_ROLES = frozenset(_USER_ROLES)
+_VALID_ROLES_MSG = ", ".join(_USER_ROLES)
+
+
+def _threshold_value(threshold: Dict[str, Any], key: str, fallback: str) -> Any:
+    """Read key, falling back only when it is absent/None (a 0 limit is a real value)"""
+    value = threshold.get(key)
+    if value is None:
+        value = threshold.get(fallback)
+    return value
+
+
+# Sensor reading bounds: (field, min, max, label)
+_READING_RANGES = (
+    ('ph', 0, 14, 'pH'),
+    ('temperature', -50, 100, 'Temperature'),
+    ('ec', 0, 20, 'EC'),
+    ('water_level', 0, 100, 'Water level'),
+)
+
+
+def _batch_value(reading: Any, field: str) -> float:
+    """
+    Column value for batch validation: NaN when absent (always passes),
+    +inf when unusable (never passes, since every bound is finite)
+    """
+    if not isinstance(reading, dict):
+        return math.inf
+    value = reading.get(field)
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.inf
+
+
+# Plain functions so internal callers skip the class attribute/staticmethod lookup
+def _check_required(value: Any, field_name: str) -> None:
+    """Validate that a value is not None or empty"""
+    if value is None:
+        raise ValidationException(
+            message=f"{field_name} is required",
+            field=field_name
+        )
+    if isinstance(value, str) and not value.strip():
+        raise ValidationException(
+            message=f"{field_name} cannot be empty",
+            field=field_name
+        )
+
+
+def _check_range(
+    value: float,
+    min_val: Optional[float],
+    max_val: Optional[float],
+    field_name: str
+) -> None:
+    """Validate that a value is within a range"""
+    if min_val is not None and value < min_val:
+        raise ValidationException(
+            message=f"{field_name} must be at least {min_val}",
+            field=field_name
+        )
+    if max_val is not None and value > max_val:
+        raise ValidationException(
+            message=f"{field_name} must be at most {max_val}",
+            field=field_name
+        )
+
 
 class BaseValidator:
     """Base validator with common validation methods"""
     
-    @staticmethod
-    def validate_required(value: Any, field_name: str) -> None:
-        """Validate that a value is not None or empty"""
-        if value is None:
-            raise ValidationException(
-                message=f"{field_name} is required",
-                field=field_name
-            )
-        if isinstance(value, str) and not value.strip():
-            raise ValidationException(
-                message=f"{field_name} cannot be empty",
-                field=field_name
-            )
+    __slots__ = ()
+    
+    validate_required = staticmethod(_check_required)
+    validate_range = staticmethod(_check_range)
     
     @staticmethod
     def validate_email(email: str) -> str:
@@ -41,9 +132,8 @@ class BaseValidator:
             )
         
         email = email.strip().lower()
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
         
-        if not re.match(email_pattern, email):
+        if not _EMAIL_RE.match(email):
             raise ValidationException(
                 message="Invalid email format",
                 field="email"
@@ -51,6 +141,16 @@ class BaseValidator:
         
         return email
     
+    @staticmethod
+    def validate_emails_batch(emails: List[str]) -> List[bool]:
+        """
+        Check many emails at once without raising
+        
+        Returns one flag per input (normalized the same way as validate_email)
+        """
+        match = _EMAIL_RE.match
+        return [bool(email) and match(email.strip().lower()) is not None for email in emails]
+    
     @staticmethod
     def validate_phone(phone: str, required: bool = False) -> Optional[str]:
         """Validate phone number format"""
@@ -63,48 +163,37 @@ class BaseValidator:
             return None
         
         # Remove spaces and dashes
-        phone = re.sub(r'[\s\-]', '', phone)
+        phone = _PHONE_STRIP_RE.sub('', phone)
         
         # Must start with + and contain only digits after
-        if not re.match(r'^\+\d{10,15}$', phone):
+        if not _PHONE_RE.match(phone):
             raise ValidationException(
                 message="Phone must be in international format (e.g., +56912345678)",
                 field="phone"
             )
         
         return phone
-    
-    @staticmethod
-    def validate_range(
-        value: float,
-        min_val: Optional[float],
-        max_val: Optional[float],
-        field_name: str
-    ) -> None:
-        """Validate that a value is within a range"""
-        if min_val is not None and value < min_val:
-            raise ValidationException(
-                message=f"{field_name} must be at least {min_val}",
-                field=field_name
-            )
-        if max_val is not None and value > max_val:
-            raise ValidationException(
-                message=f"{field_name} must be at most {max_val}",
-                field=field_name
-            )
 
 
 class AlertConfigValidator(BaseValidator):
     """Validator for alert configuration"""
     
+    __slots__ = ()
+    
     # Valid alert levels
-    VALID_LEVELS = ['info', 'warning', 'critical']
+    VALID_LEVELS = list(_ALERT_LEVELS)
     
     # Valid alert types
-    VALID_TYPES = [
-        'ph', 'temperature', 'ec', 'conductivity', 
-        'water_level', 'sensor_disconnection', 'system'
-    ]
+    VALID_TYPES = list(_ALERT_TYPES)
+    
+    # Metric -> threshold validator method name, looked up on cls so
+    # subclasses can override the per-metric validators
+    _METRIC_VALIDATORS = {
+        'ph': '_validate_ph_threshold',
+        'temperature': '_validate_temperature_threshold',
+        'conductivity': '_validate_conductivity_threshold',
+        'water_level': '_validate_water_level_threshold'
+    }
     
     @classmethod
     def validate_threshold_config(cls, config: Dict[str, Any]) -> None:
@@ -124,16 +213,10 @@ class AlertConfigValidator(BaseValidator):
             )
         
         # Validate each metric threshold
-        metric_validators = {
-            'ph': cls._validate_ph_threshold,
-            'temperature': cls._validate_temperature_threshold,
-            'conductivity': cls._validate_conductivity_threshold,
-            'water_level': cls._validate_water_level_threshold
-        }
-        
         for metric, threshold in config.items():
-            if metric in metric_validators:
-                metric_validators[metric](threshold)
+            name = cls._METRIC_VALIDATORS.get(metric)
+            if name is not None:
+                getattr(cls, name)(threshold)
     
     @classmethod
     def _validate_ph_threshold(cls, threshold: Dict[str, Any]) -> None:
@@ -141,13 +224,13 @@ class AlertConfigValidator(BaseValidator):
         if not isinstance(threshold, dict):
             return
         
-        min_val = threshold.get('min') or threshold.get('warning_min')
-        max_val = threshold.get('max') or threshold.get('warning_max')
+        min_val = _threshold_value(threshold, 'min', 'warning_min')
+        max_val = _threshold_value(threshold, 'max', 'warning_max')
         
         if min_val is not None:
-            cls.validate_range(min_val, 0, 14, 'pH min')
+            _check_range(min_val, 0, 14, 'pH min')
         if max_val is not None:
-            cls.validate_range(max_val, 0, 14, 'pH max')
+            _check_range(max_val, 0, 14, 'pH max')
         if min_val is not None and max_val is not None and min_val >= max_val:
             raise ValidationException(
                 message="pH min must be less than max",
@@ -160,13 +243,13 @@ class AlertConfigValidator(BaseValidator):
         if not isinstance(threshold, dict):
             return
         
-        min_val = threshold.get('min') or threshold.get('warning_min')
-        max_val = threshold.get('max') or threshold.get('warning_max')
+        min_val = _threshold_value(threshold, 'min', 'warning_min')
+        max_val = _threshold_value(threshold, 'max', 'warning_max')
         
         if min_val is not None:
-            cls.validate_range(min_val, -50, 100, 'Temperature min')
+            _check_range(min_val, -50, 100, 'Temperature min')
         if max_val is not None:
-            cls.validate_range(max_val, -50, 100, 'Temperature max')
+            _check_range(max_val, -50, 100, 'Temperature max')
         if min_val is not None and max_val is not None and min_val >= max_val:
             raise ValidationException(
                 message="Temperature min must be less than max",
@@ -179,10 +262,10 @@ class AlertConfigValidator(BaseValidator):
         if not isinstance(threshold, dict):
             return
         
-        max_val = threshold.get('max') or threshold.get('warning_max')
+        max_val = _threshold_value(threshold, 'max', 'warning_max')
         
         if max_val is not None:
-            cls.validate_range(max_val, 0, 10, 'Conductivity max')
+            _check_range(max_val, 0, 10, 'Conductivity max')
     
     @classmethod
     def _validate_water_level_threshold(cls, threshold: Dict[str, Any]) -> None:
@@ -190,13 +273,13 @@ class AlertConfigValidator(BaseValidator):
         if not isinstance(threshold, dict):
             return
         
-        min_val = threshold.get('min') or threshold.get('warning_min')
-        max_val = threshold.get('max') or threshold.get('warning_max')
+        min_val = _threshold_value(threshold, 'min', 'warning_min')
+        max_val = _threshold_value(threshold, 'max', 'warning_max')
         
         if min_val is not None:
-            cls.validate_range(min_val, 0, 100, 'Water level min')
+            _check_range(min_val, 0, 100, 'Water level min')
         if max_val is not None:
-            cls.validate_range(max_val, 0, 100, 'Water level max')
+            _check_range(max_val, 0, 100, 'Water level max')
     
     @classmethod
     def validate_alert_level(cls, level: str) -> str:
@@ -208,9 +291,9 @@ class AlertConfigValidator(BaseValidator):
             )
         
         normalized = level.lower().strip()
-        if normalized not in cls.VALID_LEVELS:
+        if normalized not in _VALID_LEVELS:
             raise ValidationException(
-                message=f"Invalid alert level. Must be one of: {', '.join(cls.VALID_LEVELS)}",
+                message=f"Invalid alert level. Must be one of: {_VALID_LEVELS_MSG}",
                 field="level"
             )
         
@@ -226,9 +309,9 @@ class AlertConfigValidator(BaseValidator):
             )
         
         normalized = alert_type.lower().strip()
-        if normalized not in cls.VALID_TYPES:
+        if normalized not in _VALID_TYPES:
             raise ValidationException(
-                message=f"Invalid alert type. Must be one of: {', '.join(cls.VALID_TYPES)}",
+                message=f"Invalid alert type. Must be one of: {_VALID_TYPES_MSG}",
                 field="type"
             )
         
@@ -238,6 +321,8 @@ class AlertConfigValidator(BaseValidator):
 class SensorValidator(BaseValidator):
     """Validator for sensor data"""
     
+    __slots__ = ()
+    
     @classmethod
     def validate_sensor_id(cls, sensor_id: str) -> str:
         """Validate sensor ID format"""
@@ -250,7 +335,7 @@ class SensorValidator(BaseValidator):
         sensor_id = sensor_id.strip()
         
         # Sensor ID should be alphanumeric with optional underscores
-        if not re.match(r'^[A-Za-z0-9_-]+$', sensor_id):
+        if not _SENSOR_ID_RE.match(sensor_id):
             raise ValidationException(
                 message="Sensor ID can only contain letters, numbers, underscores, and hyphens",
                 field="sensor_id"
@@ -286,38 +371,64 @@ class SensorValidator(BaseValidator):
         
         validated = {}
         
-        # Validate pH if present
-        if 'ph' in reading and reading['ph'] is not None:
-            ph = float(reading['ph'])
-            cls.validate_range(ph, 0, 14, 'pH')
-            validated['ph'] = ph
-        
-        # Validate temperature if present
-        if 'temperature' in reading and reading['temperature'] is not None:
-            temp = float(reading['temperature'])
-            cls.validate_range(temp, -50, 100, 'Temperature')
-            validated['temperature'] = temp
-        
-        # Validate EC if present
-        if 'ec' in reading and reading['ec'] is not None:
-            ec = float(reading['ec'])
-            cls.validate_range(ec, 0, 20, 'EC')
-            validated['ec'] = ec
-        
-        # Validate water level if present
-        if 'water_level' in reading and reading['water_level'] is not None:
-            level = float(reading['water_level'])
-            cls.validate_range(level, 0, 100, 'Water level')
-            validated['water_level'] = level
+        # One lookup per known metric; absent or None values are skipped
+        for field, min_val, max_val, label in _READING_RANGES:
+            value = reading.get(field)
+            if value is not None:
+                value = float(value)
+                _check_range(value, min_val, max_val, label)
+                validated[field] = value
         
         return validated
+    
+    @classmethod
+    def validate_sensor_readings_batch(cls, readings: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Validate a batch of sensor readings column-wise with NumPy
+        
+        Applies the same bounds as validate_sensor_reading, one vectorized
+        comparison per metric instead of per-reading Python checks.
+        Rows that are not dicts or hold non-numeric values are invalid.
+        
+        Args:
+            readings: Raw sensor reading dictionaries
+            
+        Returns:
+            Dict with one float64 array per metric for the valid rows
+            (NaN where the reading had no value) and "invalid_indices",
+            the positions in readings that failed validation
+        """
+        # Imported here so importing the validators does not load NumPy
+        import numpy as np
+        
+        count = len(readings)
+        raw = {}
+        bad = np.zeros(count, dtype=bool)
+        
+        for field, min_val, max_val, _ in _READING_RANGES:
+            column = np.fromiter(
+                (_batch_value(reading, field) for reading in readings),
+                dtype=np.float64,
+                count=count
+            )
+            bad |= (column < min_val) | (column > max_val)
+            raw[field] = column
+        
+        valid = ~bad
+        result: Dict[str, Any] = {field: column[valid] for field, column in raw.items()}
+        result['invalid_indices'] = np.flatnonzero(bad)
+        return result
 
 
 class UserValidator(BaseValidator):
     """Validator for user data"""
     
+    __slots__ = ()
+    
     # Password requirements
     MIN_PASSWORD_LENGTH = 8
+    _UPPER = frozenset(string.ascii_uppercase)
+    _LOWER = frozenset(string.ascii_lowercase)
     
     @classmethod
     def validate_password(cls, password: str) -> str:
@@ -345,20 +456,31 @@ class UserValidator(BaseValidator):
                 field="password"
             )
         
-        # Check for at least one uppercase, one lowercase, one digit
-        if not re.search(r'[A-Z]', password):
+        # Check for at least one uppercase, one lowercase, one digit in a single pass
+        has_upper = has_lower = has_digit = False
+        for ch in password:
+            if ch in cls._UPPER:
+                has_upper = True
+            elif ch in cls._LOWER:
+                has_lower = True
+            elif ch.isdecimal():  # same set as the \d it replaces
+                has_digit = True
+            if has_upper and has_lower and has_digit:
+                break
+        
+        if not has_upper:
             raise ValidationException(
                 message="Password must contain at least one uppercase letter",
                 field="password"
             )
         
-        if not re.search(r'[a-z]', password):
+        if not has_lower:
             raise ValidationException(
                 message="Password must contain at least one lowercase letter",
                 field="password"
             )
         
-        if not re.search(r'\d', password):
+        if not has_digit:
             raise ValidationException(
                 message="Password must contain at least one digit",
                 field="password"
@@ -369,8 +491,6 @@ class UserValidator(BaseValidator):
     @classmethod
     def validate_role(cls, role: str) -> str:
         """Validate user role"""
-        valid_roles = ['admin', 'operario', 'viewer']
-        
         if not role:
             raise ValidationException(
                 message="Role is required",
@@ -378,9 +498,9 @@ class UserValidator(BaseValidator):
             )
         
         role = role.lower().strip()
-        if role not in valid_roles:
+        if role not in _VALID_ROLES:
             raise ValidationException(
-                message=f"Invalid role. Must be one of: {', '.join(valid_roles)}",
+                message=f"Invalid role. Must be one of: {_VALID_ROLES_MSG}",
                 field="role"
             )
         
@@ -1,13 +1,17 @@
 # app/middleware/rate_limit.py
-from fastapi import Request, HTTPException, status
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from datetime import datetime, timedelta
-from collections import defaultdict
-from typing import Dict, Tuple, Optional
-import logging
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple, Tuple, Optional
 import asyncio
-import inspect
+import hashlib
+import logging
+import os
+import sys
+import time
+
+import orjson
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.settings import settings
 
 # Provide a module-level `jwt` symbol so tests can patch `app.middleware.rate_limit.jwt`.
 try:
@@ -17,7 +21,63 @@ except Exception:
 
 logger = logging.getLogger(__name__)
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+# Window lengths in seconds; timestamps come from time.monotonic()
+IP_WINDOW = 60.0
+USER_WINDOW = 3600.0
+
+# An idle bucket refills completely within USER_WINDOW, after which it is
+# indistinguishable from a new one and can be dropped
+BUCKET_IDLE_TTL = USER_WINDOW
+
+# Decoded bearer tokens kept for reuse; oldest entries are evicted first
+TOKEN_CACHE_SIZE = 10000
+
+# Sentinel for ROLE_LIMITS lookups (None already means "no limit")
+_UNKNOWN_ROLE = object()
+
+# Hard cap on clients tracked per bucket kind; past it the least recently
+# used bucket is dropped (its client starts over with a full bucket)
+MAX_BUCKETS_PER_KIND = 100000
+
+# A client over its limit is logged at most once per this many seconds;
+# under an abuse spike every rejected request would otherwise log
+REJECT_LOG_INTERVAL = 10.0
+
+
+def _token_key(token: bytes) -> bytes:
+    """Cache key for a bearer token: a short digest, so live tokens are not kept in memory"""
+    return hashlib.blake2b(token, digest_size=16).digest()
+
+
+def _json_body(content: Dict[str, Any]) -> bytes:
+    return orjson.dumps(content)
+
+
+class _TokenInfo(NamedTuple):
+    """Decoded bearer token as cached by the limiter"""
+    email: Optional[str]
+    role: str
+    exp: float
+
+
+class _Bucket:
+    """Token bucket state: tokens left and monotonic time of the last refill"""
+    
+    __slots__ = ("tokens", "last")
+    
+    def __init__(self, tokens: float, last: float):
+        self.tokens = tokens
+        self.last = last
+
+
+# Fixed 429 bodies, encoded once
+_CRITICAL_LIMIT_BODY = _json_body({
+    "detail": "Too many requests. Please wait 1 minute before trying again.",
+    "retry_after": 60
+})
+
+
+class RateLimitMiddleware:
     """
     Rate limiting middleware based on IP, user, and role.
     
@@ -31,14 +91,50 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
     Hourly limits:
     - Authenticated users: 10,000 requests/hour
     - Anonymous: N/A (limited per minute)
+    
+    When the Redis cache is connected, counts are shared by every worker:
+    critical endpoints use a sliding log (one sorted set per IP), and the
+    per-minute and hourly limits use sliding-window counters (the current
+    window's count plus the previous one's, weighted by overlap). One
+    pipeline reads every count; a second one records the request only if
+    it is admitted. Otherwise each limit is an in-process token bucket
+    (capacity = limit, refilled at limit/window per second), so state is
+    O(1) per IP/user. Either way a rejected request is not counted.
+    
+    Implemented as plain ASGI middleware: it reads path, method, client and
+    the Authorization header straight from the scope, answers 429s itself
+    and adds the X-RateLimit-* headers by wrapping send.
     """
     
-    def __init__(self, app):
-        super().__init__(app)
-        # Structure: {ip: [(timestamp, endpoint), ...]}
-        self.ip_requests: Dict[str, list] = defaultdict(list)
-        # Structure: {user_email: [(timestamp, endpoint, role), ...]}
-        self.user_requests: Dict[str, list] = defaultdict(list)
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # Structure: {"ip" | "crit": {ip: _Bucket}, "user": {email: _Bucket}}
+        # One dict per kind, keyed by the raw IP/email string, so no composite
+        # key is built per request and each kind's size is a len()
+        self.buckets: Dict[str, Dict[str, _Bucket]] = {"ip": {}, "crit": {}, "user": {}}
+        self._last_prune = time.monotonic()
+        # Background sweep of idle state, run for the app's lifespan
+        self._sweeper: Optional[asyncio.Task] = None
+        # Structure: {ip: monotonic time of its last logged rejection}
+        self._last_reject_log: Dict[str, float] = {}
+        
+        # Admitted request counters (monitoring only)
+        self.total_ip_requests = 0
+        self.total_user_requests = 0
+        # Counter: reading a role that never showed up does not insert it
+        self.requests_by_role: Dict[str, int] = Counter()
+        
+        # Structure: {token digest: (email, role, exp)}; clients resend the
+        # same token for its whole lifetime, so signatures are verified once
+        self._token_cache: Dict[bytes, _TokenInfo] = {}
+        
+        # Encoded 429 bodies, built on first use: one per (limit, role) and
+        # one per hourly limit, so denial storms never re-encode JSON
+        self._limit_bodies: Dict[Tuple[int, str], bytes] = {}
+        self._hourly_bodies: Dict[int, bytes] = {}
+        
+        # Cache service holding the shared Redis client, see _redis_client
+        self._cache_service: Optional[Any] = None
         
         # Rate limits by role (requests/minute)
         self.ROLE_LIMITS = {
@@ -54,49 +150,265 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         # Limit for critical endpoints (applies to all)
         self.CRITICAL_ENDPOINTS_LIMIT = 5  # Per minute
         
-        # Endpoints considered critical
+        # Endpoints considered critical (exact route paths)
         self.CRITICAL_ENDPOINTS = [
             "/api/token",
-            "/api/forgot-password",
-            "/api/reset-password",
+            "/api/auth/forgot-password",
+            "/api/auth/reset-password",
             # "/api/users" is handled explicitly (only POST is critical)
         ]
+        # Routes are exact paths, so membership is one hash lookup
+        self._critical_paths = frozenset(self.CRITICAL_ENDPOINTS)
     
-    def _clean_old_requests(self, requests_list: list, time_window: timedelta):
-        """Remove old requests outside the time window"""
-        now = datetime.utcnow()
-        cutoff_time = now - time_window
-        return [req for req in requests_list if req[0] > cutoff_time]
+    def _refill(self, kind: str, ident: str, capacity: int, rate: float, now: float) -> _Bucket:
+        """
+        Return the bucket for kind/ident with tokens topped up to now
+        
+        Args:
+            kind: Bucket kind ("ip", "crit", "user")
+            ident: Client IP or user email
+            capacity: Maximum tokens (the limit per window)
+            rate: Tokens added per second (capacity / window)
+            now: time.monotonic() timestamp
+        
+        An existing bucket is re-inserted at the end of the dict, which keeps
+        buckets ordered by last use for _prune_idle. A missing one comes back
+        full and unstored: _take stores it once a request is admitted, so
+        rejected requests never leave state behind
+        """
+        store = self.buckets[kind]
+        bucket = store.pop(ident, None)
+        if bucket is None:
+            return _Bucket(float(capacity), now)
+        bucket.tokens = min(float(capacity), bucket.tokens + (now - bucket.last) * rate)
+        bucket.last = now
+        store[ident] = bucket
+        return bucket
+    
+    def _take(self, kind: str, ident: str, bucket: _Bucket) -> None:
+        """Charge one token to a bucket from _refill, storing it if new"""
+        bucket.tokens -= 1
+        store = self.buckets[kind]
+        if ident not in store:
+            if len(store) >= MAX_BUCKETS_PER_KIND:
+                # Stores are in last-use order, so the first key is the LRU one
+                del store[next(iter(store))]
+            store[ident] = bucket
+    
+    def _prune_idle(self, now: float) -> None:
+        """
+        Drop state for clients that have gone quiet (at most once per IP window)
+        
+        Buckets idle long enough to be full again and cached tokens past their
+        exp are removed, so memory follows the clients active in the last hour
+        rather than every IP and token ever seen
+        """
+        if now - self._last_prune < IP_WINDOW:
+            return
+        self._last_prune = now
+        # Oldest first: stop at the first bucket still in use
+        cutoff = now - BUCKET_IDLE_TTL
+        for store in self.buckets.values():
+            stale = []
+            for ident, bucket in store.items():
+                if bucket.last > cutoff:
+                    break
+                stale.append(ident)
+            for ident in stale:
+                del store[ident]
+        
+        # Entries past the interval no longer throttle anything
+        self._last_reject_log = {
+            ip: logged for ip, logged in self._last_reject_log.items()
+            if now - logged < REJECT_LOG_INTERVAL
+        }
+        
+        wall = time.time()
+        expired = [key for key, entry in self._token_cache.items() if entry.exp <= wall]
+        for key in expired:
+            del self._token_cache[key]
+    
+    async def _sweep_idle(self) -> None:
+        """Prune idle buckets and expired tokens once per IP window, off the request path"""
+        while True:
+            await asyncio.sleep(IP_WINDOW)
+            try:
+                self._prune_idle(time.monotonic())
+            except Exception as e:
+                logger.error(f"Rate limit sweep failed: {e}")
+    
+    def _lifespan_receive(self, receive: Receive) -> Receive:
+        """Wrap lifespan receive to start the sweeper at startup and stop it at shutdown"""
+        async def wrapped() -> Message:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                if self._sweeper is None:
+                    self._sweeper = asyncio.create_task(self._sweep_idle())
+            elif message["type"] == "lifespan.shutdown" and self._sweeper is not None:
+                self._sweeper.cancel()
+                self._sweeper = None
+            return message
+        return wrapped
+    
+    def _memory_remaining(
+        self,
+        checks: List[Tuple[str, str, int, float]],
+        now: float,
+        critical_bucket: Optional[_Bucket] = None
+    ) -> List[_Bucket]:
+        """Refilled in-process buckets for each check (reusing an already refilled critical bucket)"""
+        return [
+            critical_bucket if kind == "crit" and critical_bucket is not None
+            else self._refill(kind, ident, limit, limit / window, now)
+            for kind, ident, limit, window in checks
+        ]
+    
+    def _redis_client(self) -> Optional[Any]:
+        """Shared Redis client of the cache service, if connected"""
+        cache = self._cache_service
+        if cache is None:
+            # Resolved on first request rather than at import (app.services
+            # imports the whole service layer), then kept
+            from app.services.cache import cache_service
+            cache = self._cache_service = cache_service
+        
+        if cache.enabled and cache.redis_client is not None:
+            return cache.redis_client
+        return None
+    
+    async def _redis_remaining(self, client: Any, checks: List[Tuple[str, str, int, float]]) -> Optional[List[float]]:
+        """
+        Count this request against shared Redis counters
+        
+        Critical endpoints use a sliding log (sorted set trimmed with
+        ZREMRANGEBYSCORE and read with ZCARD, so entries never leave Redis);
+        their limit is small enough that a fixed window's boundary burst
+        would double it. Other limits use a sliding-window counter: the
+        current window's count plus the previous window's count weighted by
+        how much of it still overlaps the last `window` seconds.
+        
+        Nothing is counted here: _redis_charge records the request once
+        every check has passed, so (as with the local buckets) a rejected
+        request uses up no allowance and retries do not extend a lockout.
+        
+        Returns the allowance left before this request for each check (the
+        same meaning as a bucket's tokens), or None if Redis failed and the
+        in-process buckets should be used instead
+        """
+        wall = time.time()
+        # MULTI/EXEC: one round trip, and another worker's commands cannot
+        # land between a critical log's trim and count
+        pipe = client.pipeline(transaction=True)
+        # Position of each check's count in the pipeline results, and the
+        # weight of the previous window for counter checks
+        positions = []
+        weights = []
+        ops = 0
+        for kind, ident, limit, window in checks:
+            if kind == "crit":
+                redis_key = f"rl:crit:{ident}"
+                pipe.zremrangebyscore(redis_key, 0, wall - window)
+                pipe.zcard(redis_key)
+                positions.append(ops + 1)
+                weights.append(None)
+                ops += 2
+            else:
+                index = int(wall // window)
+                pipe.get(f"rl:{kind}:{ident}:{index}")
+                pipe.get(f"rl:{kind}:{ident}:{index - 1}")
+                positions.append(ops)
+                weights.append(1.0 - (wall - index * window) / window)
+                ops += 2
+        try:
+            results = await pipe.execute()
+        except Exception as e:
+            logger.debug(f"Redis rate limit unavailable, using local buckets: {e}")
+            return None
+        remaining = []
+        for (_, _, limit, _), position, weight in zip(checks, positions, weights):
+            count = float(results[position] or 0)
+            if weight is not None:
+                count += int(results[position + 1] or 0) * weight
+            remaining.append(limit - count)
+        return remaining
+    
+    async def _redis_charge(self, client: Any, checks: List[Tuple[str, str, int, float]]) -> None:
+        """
+        Count an admitted request against every check's shared state
+        
+        A second round trip, only for admitted requests; workers racing
+        between the check and this charge can overshoot a limit by at most
+        their own number of concurrent requests
+        """
+        wall = time.time()
+        pipe = client.pipeline(transaction=True)
+        for kind, ident, limit, window in checks:
+            if kind == "crit":
+                redis_key = f"rl:crit:{ident}"
+                pipe.zadd(redis_key, {f"{time.time_ns()}:{os.urandom(4).hex()}": wall})
+                # Only the newest `limit` entries can matter for the count
+                pipe.zremrangebyrank(redis_key, 0, -limit - 1)
+                pipe.expire(redis_key, int(window))
+            else:
+                redis_key = f"rl:{kind}:{ident}:{int(wall // window)}"
+                pipe.incr(redis_key)
+                # Kept for a second window, where it is the previous count
+                pipe.expire(redis_key, int(window) * 2, nx=True)
+        try:
+            await pipe.execute()
+        except Exception as e:
+            logger.debug(f"Redis rate limit charge failed: {e}")
     
     def _is_critical_endpoint(self, path: str, method: str) -> bool:
         """Determine if an endpoint is critical"""
-        if path == "/api/users" and method == "POST":
-            return True
-        return any(path.startswith(endpoint) for endpoint in self.CRITICAL_ENDPOINTS)
+        return path in self._critical_paths or (path == "/api/users" and method == "POST")
     
-    def _get_user_from_token(self, request: Request) -> Tuple[Optional[str], Optional[str]]:
+    def _get_user_from_token(self, auth_header: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
         """
         Extract user email and role from JWT token.
         
+        Args:
+            auth_header: Value of the Authorization header, if any
+        
         Returns:
             Tuple[email, role] or (None, None) if no valid token
         """
-        auth_header = request.headers.get("Authorization")
         if not auth_header or not auth_header.startswith("Bearer "):
             return None, None
+        return self._get_user_from_bearer(auth_header[7:].encode("latin-1"))
+    
+    def _get_user_from_bearer(self, token: bytes) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Email and role for a bearer token, taken from the header as bytes
+        
+        A digest of the raw bytes keys the decoded-token cache, so a repeat
+        request costs one hash and one dict lookup and no JWT decoding
+        """
+        key = _token_key(token)
+        cached = self._token_cache.get(key)
+        if cached is not None:
+            if cached.exp > time.time():
+                return cached.email, cached.role
+            # Expired: decode again so jose reports it
+            del self._token_cache[key]
         
         try:
-            from jose import jwt
-            from app.config.settings import settings
-            
-            token = auth_header.split(" ")[1]
             payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
             email = payload.get("sub")
-            role = payload.get("role", "usuario")  # Default: basic user
-            return email, role
+            # Normalised once here (and cached with the token) so the hot
+            # path compares interned strings instead of calling lower()
+            role = sys.intern(str(payload.get("role") or "usuario").lower())  # Default: basic user
         except Exception as e:
             logger.debug(f"Error decoding token: {e}")
             return None, None
+        
+        # Tokens without exp never expire on their own; leave them uncached
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            if len(self._token_cache) >= TOKEN_CACHE_SIZE:
+                del self._token_cache[next(iter(self._token_cache))]
+            self._token_cache[key] = _TokenInfo(email, role, float(exp))
+        return email, role
     
     def _get_rate_limit_for_role(self, role: Optional[str]) -> Optional[int]:
         """
@@ -110,161 +422,265 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         """
         if role is None:
             return self.ROLE_LIMITS["anonymous"]
-        return self.ROLE_LIMITS.get(role.lower(), self.ROLE_LIMITS["usuario"])
+        # Roles from tokens are already lower-case and interned, so one lookup
+        # settles them; anything else is normalised here
+        limit = self.ROLE_LIMITS.get(role, _UNKNOWN_ROLE)
+        if limit is _UNKNOWN_ROLE:
+            limit = self.ROLE_LIMITS.get(role.lower(), self.ROLE_LIMITS["usuario"])
+        return limit
+    
+    @staticmethod
+    async def _send_429(send: Send, body: bytes, retry_after: bytes) -> None:
+        """Answer the request with a 429 JSON response"""
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", retry_after),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+    
+    def _limit_body(self, rate_limit: int, role: str) -> bytes:
+        """Encoded 429 body for the per-minute limit"""
+        body = self._limit_bodies.get((rate_limit, role))
+        if body is None:
+            body = self._limit_bodies[(rate_limit, role)] = _json_body({
+                "detail": f"Request limit exceeded ({rate_limit}/min). Try again in 1 minute.",
+                "retry_after": 60,
+                "limit": rate_limit,
+                "role": role
+            })
+        return body
+    
+    def _hourly_body(self) -> bytes:
+        """Encoded 429 body for the hourly user limit"""
+        body = self._hourly_bodies.get(self.USER_LIMIT_PER_HOUR)
+        if body is None:
+            body = self._hourly_bodies[self.USER_LIMIT_PER_HOUR] = _json_body({
+                "detail": f"Hourly request limit exceeded ({self.USER_LIMIT_PER_HOUR}/hour). Try again later.",
+                "retry_after": 3600
+            })
+        return body
+    
+    def _should_log_reject(self, client_ip: str, now: float) -> bool:
+        """Whether a rejection for this IP is logged (level enabled, not logged in the last interval)"""
+        if not logger.isEnabledFor(logging.WARNING):
+            return False
+        last = self._last_reject_log.get(client_ip)
+        if last is not None and now - last < REJECT_LOG_INTERVAL:
+            return False
+        if len(self._last_reject_log) >= MAX_BUCKETS_PER_KIND:
+            self._last_reject_log.clear()
+        self._last_reject_log[client_ip] = now
+        return True
+    
+    async def _reject_critical(
+        self, send: Send, client_ip: str, user_email: Optional[str], path: str, now: float
+    ) -> None:
+        """429 for a client over the critical-endpoint limit"""
+        if self._should_log_reject(client_ip, now):
+            logger.warning(
+                "Critical endpoint rate limit exceeded",
+                extra={
+                    "ip": client_ip,
+                    "user": user_email,
+                    "path": path
+                }
+            )
+        await self._send_429(send, _CRITICAL_LIMIT_BODY, b"60")
     
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            if scope["type"] == "lifespan":
+                receive = self._lifespan_receive(receive)
+            await self.app(scope, receive, send)
+            return
+        
+        path = scope["path"]
+        
         # Exclude health checks and WebSocket from rate limiting
-        if (request.url.path.startswith("/health") or 
-            request.url.path == "/" or 
-            request.url.path.startswith("/ws/")):
-            # Support sync or async call_next implementations in tests/mocks
-            maybe_resp = call_next(request)
-            if inspect.isawaitable(maybe_resp) or asyncio.iscoroutine(maybe_resp):
-                return await maybe_resp
-            return maybe_resp
-        
-        client_ip = request.client.host
-        now = datetime.utcnow()
-        path = request.url.path
-        method = request.method
+        if path.startswith("/health") or path == "/" or path.startswith("/ws/"):
+            await self.app(scope, receive, send)
+            return
+        
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        now = time.monotonic()
+        method = scope["method"]
+        
+        # Single pass over the raw header list; only the token is kept, as bytes
+        token = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                if value.startswith(b"Bearer "):
+                    token = value[7:]
+                break
         
         # Check if critical endpoint
         is_critical = self._is_critical_endpoint(path, method)
+        redis_client = self._redis_client()
+        
+        # The critical limit is the same for every role, so a client already
+        # over it is turned away before its token is looked at (local buckets
+        # only; with Redis every count arrives in the one pipeline below)
+        critical_bucket = None
+        if is_critical and redis_client is None:
+            critical_bucket = self._refill(
+                "crit",
+                client_ip,
+                self.CRITICAL_ENDPOINTS_LIMIT,
+                self.CRITICAL_ENDPOINTS_LIMIT / IP_WINDOW,
+                now
+            )
+            if critical_bucket.tokens < 1:
+                await self._reject_critical(send, client_ip, None, path, now)
+                return
         
         # Get authenticated user and role
-        user_email, user_role = self._get_user_from_token(request)
+        if token:
+            user_email, user_role = self._get_user_from_bearer(token)
+        else:
+            user_email, user_role = None, None
         
         # Get appropriate limit based on role
         rate_limit = self._get_rate_limit_for_role(user_role)
         
-        # Rate limiting by IP (1 minute window)
-        self.ip_requests[client_ip] = self._clean_old_requests(
-            self.ip_requests[client_ip],
-            timedelta(minutes=1)
-        )
-        
-        # === RATE LIMITING FOR CRITICAL ENDPOINTS ===
+        # (kind, IP/email, limit, window) for every limit this request counts against
+        checks: List[Tuple[str, str, int, float]] = []
         if is_critical:
-            critical_requests = [req for req in self.ip_requests[client_ip] 
-                                if self._is_critical_endpoint(req[1], method)]
-            
-            if len(critical_requests) >= self.CRITICAL_ENDPOINTS_LIMIT:
-                logger.warning(
-                    f"Critical endpoint rate limit exceeded",
-                    extra={
-                        "ip": client_ip,
-                        "user": user_email,
-                        "path": path,
-                        "requests": len(critical_requests)
-                    }
-                )
-                return JSONResponse(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    content={
-                        "detail": "Too many requests. Please wait 1 minute before trying again.",
-                        "retry_after": 60
-                    },
-                    headers={"Retry-After": "60"}
-                )
-        
-        # === RATE LIMITING BY ROLE (per minute) ===
-        # Admins have no limit
+            checks.append(("crit", client_ip, self.CRITICAL_ENDPOINTS_LIMIT, IP_WINDOW))
+        # Admins have no per-minute limit
         if rate_limit is not None:
-            if len(self.ip_requests[client_ip]) >= rate_limit:
-                logger.warning(
-                    f"Rate limit exceeded",
-                    extra={
-                        "ip": client_ip,
-                        "user": user_email,
-                        "role": user_role or "anonymous",
-                        "limit": rate_limit,
-                        "requests": len(self.ip_requests[client_ip])
-                    }
-                )
-                return JSONResponse(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    content={
-                        "detail": f"Request limit exceeded ({rate_limit}/min). Try again in 1 minute.",
-                        "retry_after": 60,
-                        "limit": rate_limit,
-                        "role": user_role or "anonymous"
-                    },
-                    headers={"Retry-After": "60"}
-                )
+            checks.append(("ip", client_ip, rate_limit, IP_WINDOW))
+        # Only apply hourly limit if not admin
+        if user_email and user_role and user_role != "administrador":
+            checks.append(("user", user_email, self.USER_LIMIT_PER_HOUR, USER_WINDOW))
         
-        # === RATE LIMITING BY USER (per hour) ===
-        if user_email:
-            self.user_requests[user_email] = self._clean_old_requests(
-                self.user_requests[user_email],
-                timedelta(hours=1)
-            )
+        # Without a lifespan (no sweeper) idle state is pruned inline instead
+        if self._sweeper is None:
+            self._prune_idle(now)
+        
+        remaining = None
+        buckets = None
+        if redis_client is not None and checks:
+            remaining = await self._redis_remaining(redis_client, checks)
+        if remaining is None:
+            # Local buckets are checked first and only charged once every
+            # check passes, so a rejected request does not use up tokens
+            buckets = self._memory_remaining(checks, now, critical_bucket)
+            remaining = [bucket.tokens for bucket in buckets]
+        
+        ip_remaining = None
+        for (kind, _, _, _), left in zip(checks, remaining):
+            if kind == "ip":
+                ip_remaining = left - 1
+            if left >= 1:
+                continue
+            
+            # === RATE LIMITING FOR CRITICAL ENDPOINTS ===
+            if kind == "crit":
+                await self._reject_critical(send, client_ip, user_email, path, now)
+                return
             
-            # Only apply hourly limit if not admin
-            if user_role and user_role.lower() != "administrador":
-                if len(self.user_requests[user_email]) >= self.USER_LIMIT_PER_HOUR:
+            # === RATE LIMITING BY ROLE (per minute) ===
+            if kind == "ip":
+                if self._should_log_reject(client_ip, now):
                     logger.warning(
-                        f"Hourly rate limit exceeded",
+                        "Rate limit exceeded",
                         extra={
+                            "ip": client_ip,
                             "user": user_email,
-                            "role": user_role,
-                            "requests": len(self.user_requests[user_email])
+                            "role": user_role or "anonymous",
+                            "limit": rate_limit
                         }
                     )
-                    return JSONResponse(
-                        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                        content={
-                            "detail": f"Hourly request limit exceeded ({self.USER_LIMIT_PER_HOUR}/hour). Try again later.",
-                            "retry_after": 3600
-                        },
-                        headers={"Retry-After": "3600"}
-                    )
+                await self._send_429(send, self._limit_body(rate_limit, user_role or "anonymous"), b"60")
+                return
             
-            # Record user request with role
-            self.user_requests[user_email].append((now, path, user_role))
-        
-        # Record IP request
-        self.ip_requests[client_ip].append((now, path))
+            # === RATE LIMITING BY USER (per hour) ===
+            if self._should_log_reject(client_ip, now):
+                logger.warning(
+                    "Hourly rate limit exceeded",
+                    extra={
+                        "user": user_email,
+                        "role": user_role
+                    }
+                )
+            await self._send_429(send, self._hourly_body(), b"3600")
+            return
         
-        # Continue with request. Some tests mock `call_next` as a sync function
-        # that returns a Response object (not awaitable). Support both awaitable
-        # and non-awaitable call_next implementations.
-        maybe_response = call_next(request)
-        if inspect.isawaitable(maybe_response) or asyncio.iscoroutine(maybe_response):
-            response = await maybe_response
+        # Charge the local buckets (or the shared Redis state) and record the request
+        if buckets is not None:
+            for (kind, ident, _, _), bucket in zip(checks, buckets):
+                self._take(kind, ident, bucket)
         else:
-            response = maybe_response
+            await self._redis_charge(redis_client, checks)
+        self.total_ip_requests += 1
+        if user_email:
+            # Record user request with role
+            self.total_user_requests += 1
+            self.requests_by_role[user_role or "unknown"] += 1
         
-        # Add rate limit info headers
+        # Rate limit info headers, added when the response starts
         if rate_limit is not None:
-            remaining_requests = max(0, rate_limit - len(self.ip_requests[client_ip]))
-            response.headers["X-RateLimit-Limit"] = str(rate_limit)
-            response.headers["X-RateLimit-Remaining"] = str(remaining_requests)
-            response.headers["X-RateLimit-Reset"] = str(int((now + timedelta(minutes=1)).timestamp()))
+            extra_headers = [
+                (b"x-ratelimit-limit", str(rate_limit).encode()),
+                (b"x-ratelimit-remaining", str(max(0, int(ip_remaining))).encode()),
+                (b"x-ratelimit-reset", str(int(time.time() + IP_WINDOW)).encode()),
+            ]
         else:
             # Admins
-            response.headers["X-RateLimit-Limit"] = "unlimited"
-            response.headers["X-RateLimit-Remaining"] = "unlimited"
+            extra_headers = [
+                (b"x-ratelimit-limit", b"unlimited"),
+                (b"x-ratelimit-remaining", b"unlimited"),
+            ]
         
         if user_role:
-            response.headers["X-RateLimit-Role"] = user_role
+            extra_headers.append((b"x-ratelimit-role", user_role.encode("latin-1", "replace")))
+        
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", ())) + extra_headers
+            await send(message)
         
-        return response
+        await self.app(scope, receive, send_with_headers)
+    
+    async def get_shared_stats(self) -> Optional[Dict[str, int]]:
+        """
+        Clients seen in the current window across all workers
+        
+        Counts the current window's Redis counter keys with SCAN (never
+        KEYS, which blocks the server). None when Redis is not in use or
+        the scan fails; get_stats() then only describes this process
+        """
+        client = self._redis_client()
+        if client is None:
+            return None
+        wall = time.time()
+        stats = {}
+        try:
+            for kind, window, field in (("ip", IP_WINDOW, "active_ips"), ("user", USER_WINDOW, "active_users")):
+                count = 0
+                async for _ in client.scan_iter(match=f"rl:{kind}:*:{int(wall // window)}", count=1000):
+                    count += 1
+                stats[field] = count
+        except Exception as e:
+            logger.debug(f"Redis rate limit stats unavailable: {e}")
+            return None
+        return stats
     
     def get_stats(self) -> Dict:
         """Get rate limiting statistics (useful for monitoring)"""
-        # Count requests by role
-        role_stats = defaultdict(int)
-        for user_email, requests in self.user_requests.items():
-            if requests:
-                role = requests[-1][2] if len(requests[-1]) > 2 else "unknown"
-                role_stats[role] += len(requests)
-        
         return {
-            "active_ips": len(self.ip_requests),
-            "active_users": len(self.user_requests),
-            "total_ip_requests": sum(len(reqs) for reqs in self.ip_requests.values()),
-            "total_user_requests": sum(len(reqs) for reqs in self.user_requests.values()),
-            "requests_by_role": dict(role_stats),
+            "active_ips": len(self.buckets["ip"]),
+            "active_users": len(self.buckets["user"]),
+            "active_buckets": sum(len(store) for store in self.buckets.values()),
+            "total_ip_requests": self.total_ip_requests,
+            "total_user_requests": self.total_user_requests,
+            "requests_by_role": dict(self.requests_by_role),
             "rate_limits": {
                 "administrador": "unlimited",
                 "operario": f"{self.ROLE_LIMITS['operario']}/min",
@@ -4,37 +4,63 @@ Middleware for adding unique Request ID to each request
 Useful for traceability and debugging
 """
 
-import uuid
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+import os
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from app.utils.logging import request_id_var
 
+# Client-supplied IDs longer than this are replaced; the ID is copied into
+# every log record of the request
+MAX_REQUEST_ID_LENGTH = 128
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
+
+class RequestIDMiddleware:
     """
     Middleware that adds a unique Request ID to each request
     The Request ID is propagated through:
     1. Response header: X-Request-ID
     2. Context variable for structured logging
     3. Logs automatically (via StructuredLogger)
+    
+    Plain ASGI middleware: the request runs in the same task, with no
+    Request object or response stream built around it
     """
     
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
         # Generate or extract Request ID
-        request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
+        raw = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                raw = value
+                break
+        if raw and len(raw) <= MAX_REQUEST_ID_LENGTH:
+            # Echo the client's bytes back as-is
+            request_id = raw.decode("latin-1")
+            header = (b"x-request-id", raw)
+        else:
+            # 128 random bits as 32 hex chars; same entropy as uuid4 without
+            # building and formatting a UUID object
+            request_id = os.urandom(16).hex()
+            header = (b"x-request-id", request_id.encode("latin-1"))
+        
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Add Request ID to response header
+                message["headers"] = list(message.get("headers", ())) + [header]
+            await send(message)
         
         # Save in context var for logging
         token = request_id_var.set(request_id)
         
         try:
             # Process request
-            response: Response = await call_next(request)
-            
-            # Add Request ID to response header
-            response.headers["X-Request-ID"] = request_id
-            
-            return response
+            await self.app(scope, receive, send_with_request_id)
         finally:
             # Clean context var
             request_id_var.reset(token)
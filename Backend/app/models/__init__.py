@@ -3,44 +3,98 @@ Models package
 Pydantic models for data validation
 """
 
-from .user import (
-    PyObjectId,
-    TokenData,
-    Token,
-    UserBase,
-    UserCreate,
-    UserUpdate,
-    UserPublic,
-    ForgotPasswordRequest,
-    ResetPasswordRequest,
-    ChangePasswordRequest
-)
+import importlib
+from typing import TYPE_CHECKING
+
+# Submodules are imported on first attribute access (PEP 562) so that
+# importing one model does not build every pydantic class in the package
+_EXPORTS = {
+    # User models
+    "PyObjectId": "user",
+    "TokenData": "user",
+    "Token": "user",
+    "UserBase": "user",
+    "UserCreate": "user",
+    "UserUpdate": "user",
+    "UserPublic": "user",
+    "ForgotPasswordRequest": "user",
+    "ResetPasswordRequest": "user",
+    "ChangePasswordRequest": "user",
+    # Alert models
+    "AlertLevel": "alert_models",
+    "AlertType": "alert_models",
+    "AlertStatus": "alert_models",
+    "AlertThresholds": "alert_models",
+    "ActiveAlert": "alert_models",
+    "AlertHistory": "alert_models",
+    "AlertSummary": "alert_models",
+    "AlertConfigUpdateRequest": "alert_models",
+    "DismissAlertRequest": "alert_models",
+    "DismissAlertsBulkRequest": "alert_models",
+    # Audit models
+    "AuditAction": "audit_models",
+    "AuditLogEntry": "audit_models",
+    "AuditLogResponse": "audit_models",
+    "AuditLogFilter": "audit_models",
+    # Sensor models
+    "SensorReading": "sensor_models",
+    "PredictionRequest": "sensor_models",
+    "SensorConfigUpdate": "sensor_models",
+    "TimeRangeQuery": "sensor_models",
+}
+
+if TYPE_CHECKING:
+    from .user import (
+        PyObjectId,
+        TokenData,
+        Token,
+        UserBase,
+        UserCreate,
+        UserUpdate,
+        UserPublic,
+        ForgotPasswordRequest,
+        ResetPasswordRequest,
+        ChangePasswordRequest
+    )
+    from .alert_models import (
+        AlertLevel,
+        AlertType,
+        AlertStatus,
+        AlertThresholds,
+        ActiveAlert,
+        AlertHistory,
+        AlertSummary,
+        AlertConfigUpdateRequest,
+        DismissAlertRequest,
+        DismissAlertsBulkRequest
+    )
+    from .audit_models import (
+        AuditAction,
+        AuditLogEntry,
+        AuditLogResponse,
+        AuditLogFilter
+    )
+    from .sensor_models import (
+        SensorReading,
+        PredictionRequest,
+        SensorConfigUpdate,
+        TimeRangeQuery
+    )
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    # Cache on the package so later lookups skip this hook
+    globals()[name] = value
+    return value
 
-from .alert_models import (
-    AlertLevel,
-    AlertType,
-    AlertStatus,
-    AlertThresholds,
-    ActiveAlert,
-    AlertHistory,
-    AlertSummary,
-    AlertConfigUpdateRequest,
-    DismissAlertRequest
-)
 
-from .audit_models import (
-    AuditAction,
-    AuditLogEntry,
-    AuditLogResponse,
-    AuditLogFilter
-)
+def __dir__():
+    return sorted(list(globals()) + list(_EXPORTS))
 
-from .sensor_models import (
-    SensorReading,
-    PredictionRequest,
-    SensorConfigUpdate,
-    TimeRangeQuery
-)
 
 __all__ = [
     # User models
@@ -64,6 +118,7 @@ __all__ = [
     "AlertSummary",
     "AlertConfigUpdateRequest",
     "DismissAlertRequest",
+    "DismissAlertsBulkRequest",
     # Audit models
     "AuditAction",
     "AuditLogEntry",
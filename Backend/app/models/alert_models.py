@@ -1,10 +1,14 @@
 # Backend/models/alert_models.py
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, ValidationInfo, field_validator
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timezone
 from enum import Enum
 from bson import ObjectId
+import re
+
+# Compiled once at import instead of looked up in re's cache per validation
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
 
 class AlertLevel(str, Enum):
     INFO = "info"
@@ -25,6 +29,8 @@ class AlertStatus(str, Enum):
 
 class ThresholdConfig(BaseModel):
     """Threshold configuration for a specific parameter"""
+    model_config = ConfigDict(frozen=True)
+    
     optimal_min: Optional[float] = None
     optimal_max: Optional[float] = None
     warning_min: Optional[float] = None
@@ -32,32 +38,21 @@ class ThresholdConfig(BaseModel):
     critical_min: Optional[float] = None
     critical_max: Optional[float] = None
     
-    @validator('optimal_max')
-    def optimal_max_greater_than_min(cls, v, values):
-        """Validate that optimal_max > optimal_min"""
-        if v is not None and 'optimal_min' in values and values['optimal_min'] is not None:
-            if v <= values['optimal_min']:
-                raise ValueError('optimal_max must be greater than optimal_min')
-        return v
-    
-    @validator('warning_max')
-    def warning_max_greater_than_min(cls, v, values):
-        """Validate that warning_max > warning_min"""
-        if v is not None and 'warning_min' in values and values['warning_min'] is not None:
-            if v <= values['warning_min']:
-                raise ValueError('warning_max must be greater than warning_min')
-        return v
-    
-    @validator('critical_max')
-    def critical_max_greater_than_min(cls, v, values):
-        """Validate that critical_max > critical_min"""
-        if v is not None and 'critical_min' in values and values['critical_min'] is not None:
-            if v <= values['critical_min']:
-                raise ValueError('critical_max must be greater than critical_min')
+    @field_validator('optimal_max', 'warning_max', 'critical_max')
+    @classmethod
+    def max_greater_than_min(cls, v: Optional[float], info: ValidationInfo) -> Optional[float]:
+        """Validate that each *_max > its *_min (fields are validated in order, so *_min is in info.data)"""
+        min_field = info.field_name.replace('_max', '_min')
+        minimum = info.data.get(min_field)
+        if v is not None and minimum is not None and v <= minimum:
+            raise ValueError(f'{info.field_name} must be greater than {min_field}')
         return v
 
 class AlertThresholds(BaseModel):
     """Complete threshold configuration - Specific for Blueberry cultivation in Chile"""
+    # Read-only once validated; frozen (with frozen ThresholdConfig) also makes instances hashable
+    model_config = ConfigDict(frozen=True)
+    
     ph: ThresholdConfig = ThresholdConfig(
         optimal_min=5.0, optimal_max=5.5,
         warning_min=4.5, warning_max=6.0,
@@ -148,12 +143,11 @@ class AlertConfigUpdateRequest(BaseModel):
     updated_by: str  # Admin email
     reason: Optional[str] = Field(None, max_length=500)
     
-    @validator('updated_by')
-    def validate_email(cls, v):
+    @field_validator('updated_by')
+    @classmethod
+    def validate_email(cls, v: str) -> str:
         """Validate email format"""
-        import re
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(email_pattern, v):
+        if not _EMAIL_RE.match(v):
             raise ValueError('Invalid email format')
         return v.lower()
 
@@ -162,40 +156,33 @@ class DismissAlertRequest(BaseModel):
     alert_id: str
     reason: Optional[str] = Field(None, max_length=500)
     
-    @validator('alert_id')
-    def validate_alert_id(cls, v):
+    @field_validator('alert_id')
+    @classmethod
+    def validate_alert_id(cls, v: str) -> str:
         """Validate that alert_id is not empty"""
         if not v or not v.strip():
             raise ValueError('alert_id cannot be empty')
         return v.strip()
     # dismissed_by is automatically obtained from authenticated user
 
-# Predefined configuration for Blueberry cultivation in Chile
-BLUEBERRY_CHILE_THRESHOLDS = AlertThresholds(
-    ph=ThresholdConfig(
-        optimal_min=5.0, optimal_max=5.5,
-        warning_min=4.5, warning_max=6.0,
-        critical_min=4.0, critical_max=6.5
-    ),
-    conductivity=ThresholdConfig(
-        optimal_min=0.0, optimal_max=1.0,
-        warning_min=0.0, warning_max=1.5,
-        critical_min=0.0, critical_max=2.0
-    ),
-    temperature=ThresholdConfig(
-        optimal_min=15.0, optimal_max=30.0,
-        warning_min=10.0, warning_max=35.0,
-        critical_min=5.0, critical_max=40.0
-    ),
-    water_level=ThresholdConfig(
-        optimal_min=60.0, optimal_max=90.0,
-        # Default thresholds adjusted to allow very low water level settings
-        warning_min=0.0, warning_max=95.0,
-        critical_min=0.0, critical_max=98.0
-    ),
-    sensor_timeout_warning=6,
-    sensor_timeout_critical=15
-)
+class DismissAlertsBulkRequest(BaseModel):
+    """Request to close several alerts at once - Operator or Admin"""
+    alert_ids: List[str] = Field(..., min_length=1, max_length=200)
+    reason: Optional[str] = Field(None, max_length=500)
+    
+    @field_validator('alert_ids')
+    @classmethod
+    def validate_alert_ids(cls, v: List[str]) -> List[str]:
+        """Strip IDs, dropping empty and repeated ones"""
+        ids = list(dict.fromkeys(alert_id.strip() for alert_id in v if alert_id and alert_id.strip()))
+        if not ids:
+            raise ValueError('alert_ids cannot be empty')
+        return ids
+
+# Predefined configuration for Blueberry cultivation in Chile. The field
+# defaults above are exactly these values, and frozen defaults are shared
+# rather than copied, so this reuses the same ThresholdConfig instances
+BLUEBERRY_CHILE_THRESHOLDS = AlertThresholds()
 
 class ParameterThreshold(BaseModel):
     """Threshold for an individual parameter"""
@@ -217,8 +204,9 @@ class UpdateSensorAlertConfigRequest(BaseModel):
     sensor_id: str
     alert_config: SensorAlertConfig
     
-    @validator('sensor_id')
-    def validate_sensor_id(cls, v):
+    @field_validator('sensor_id')
+    @classmethod
+    def validate_sensor_id(cls, v: str) -> str:
         if not v or not v.strip():
             raise ValueError('sensor_id cannot be empty')
         return v.strip()
\ No newline at end of file
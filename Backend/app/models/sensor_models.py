@@ -3,42 +3,51 @@
 Pydantic models for sensor data validation
 """
 
-from pydantic import BaseModel, Field, validator
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, ValidationInfo, field_validator, model_validator
+from pydantic_core import PydanticCustomError
+from typing import Literal, Optional
 from datetime import datetime
 
 
+# Messages for SensorReading values outside their operational range
+_OPERATIONAL_RANGE_MESSAGES = {
+    'temperature': 'Temperature out of operational range: {v}°C (expected: -10 to 50°C)',
+    'ph': 'pH out of operational range: {v} (expected: 3 to 10)',
+    'ec': 'Conductivity out of operational range: {v} dS/m (expected: 0 to 10)',
+}
+
+
 class SensorReading(BaseModel):
     """Model for validating sensor readings"""
-    temperature: float = Field(..., ge=-50, le=100, description="Temperature in °C")
-    ph: float = Field(..., ge=0, le=14, description="pH level")
-    ec: float = Field(..., ge=0, le=20, description="Electrical conductivity (dS/m)")
+    # Bounds are the operational ranges, checked by pydantic-core itself;
+    # operational_range_messages only rewrites the messages of failed checks
+    temperature: float = Field(..., ge=-10, le=50, description="Temperature in °C")
+    ph: float = Field(..., ge=3, le=10, description="pH level")
+    ec: float = Field(..., ge=0, le=10, description="Electrical conductivity (dS/m)")
     water_level: float = Field(..., ge=0, le=100, description="Water level (%)")
     timestamp: Optional[datetime] = None
     reservoir_id: Optional[str] = Field(None, min_length=1, max_length=100)
     
-    @validator('temperature')
-    def validate_temperature(cls, v):
-        """Validate reasonable temperature range"""
-        if v < -10 or v > 50:
-            raise ValueError(f'Temperature out of operational range: {v}°C (expected: -10 to 50°C)')
-        return v
-    
-    @validator('ph')
-    def validate_ph(cls, v):
-        """Validate reasonable pH range"""
-        if v < 3 or v > 10:
-            raise ValueError(f'pH out of operational range: {v} (expected: 3 to 10)')
-        return v
-    
-    @validator('ec')
-    def validate_conductivity(cls, v):
-        """Validate reasonable conductivity range"""
-        if v < 0 or v > 10:
-            raise ValueError(f'Conductivity out of operational range: {v} dS/m (expected: 0 to 10)')
-        return v
+    @model_validator(mode='wrap')
+    @classmethod
+    def operational_range_messages(cls, data, handler):
+        """Report out-of-range readings with the operational range instead of pydantic's bound message"""
+        try:
+            return handler(data)
+        except ValidationError as exc:
+            line_errors = []
+            for error in exc.errors():
+                field = error['loc'][0] if error['loc'] else None
+                if field in _OPERATIONAL_RANGE_MESSAGES and error['type'] in ('greater_than_equal', 'less_than_equal'):
+                    message = _OPERATIONAL_RANGE_MESSAGES[field].format(v=float(error['input']))
+                    error_type = PydanticCustomError('value_error', 'Value error, {message}', {'message': message})
+                    line_errors.append({'type': error_type, 'loc': error['loc'], 'input': error['input']})
+                else:
+                    line_errors.append({key: error[key] for key in ('type', 'loc', 'input', 'ctx') if key in error})
+            raise ValidationError.from_exception_data(exc.title, line_errors)
     
-    @validator('reservoir_id')
+    @field_validator('reservoir_id')
+    @classmethod
     def validate_reservoir_id(cls, v):
         """Clean and validate reservoir_id"""
         if v is not None:
@@ -47,48 +56,51 @@ class SensorReading(BaseModel):
                 raise ValueError('reservoir_id cannot be empty')
         return v
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "temperature": 22.5,
-                "ph": 5.3,
-                "ec": 0.8,
-                "water_level": 75.0,
-                "reservoir_id": "EMBALSE_01"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "temperature": 22.5,
+            "ph": 5.3,
+            "ec": 0.8,
+            "water_level": 75.0,
+            "reservoir_id": "EMBALSE_01"
         }
+    })
 
 
 class PredictionRequest(BaseModel):
     """Model for prediction requests"""
-    sensor_type: str = Field(..., pattern="^(ph|temperature|conductivity|water_level)$")
+    # A Literal is a set lookup in pydantic-core rather than a regex match
+    sensor_type: Literal["ph", "temperature", "conductivity", "water_level"]
     days: int = Field(..., ge=1, le=30, description="Days to predict (1-30)")
     lookback_days: int = Field(..., ge=1, le=90, description="Historical days for model (1-90)")
     
-    @validator('days')
+    @field_validator('days')
+    @classmethod
     def validate_prediction_days(cls, v):
         """Validate reasonable prediction days"""
         if v > 7:
             raise ValueError('Predictions beyond 7 days have low reliability')
         return v
     
-    @validator('lookback_days')
-    def validate_lookback_days(cls, v, values):
+    @field_validator('lookback_days')
+    @classmethod
+    def validate_lookback_days(cls, v, info: ValidationInfo):
         """Validate sufficient lookback_days"""
         if v < 7:
             raise ValueError('At least 7 days of historical data required')
-        if 'days' in values and v < values['days'] * 3:
-            raise ValueError(f'Recommend at least {values["days"] * 3} historical days')
+        # days is absent from info.data when it failed its own validation
+        days = info.data.get('days')
+        if days is not None and v < days * 3:
+            raise ValueError(f'Recommend at least {days * 3} historical days')
         return v
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "sensor_type": "ph",
-                "days": 3,
-                "lookback_days": 14
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "sensor_type": "ph",
+            "days": 3,
+            "lookback_days": 14
         }
+    })
 
 
 class SensorConfigUpdate(BaseModel):
@@ -98,12 +110,14 @@ class SensorConfigUpdate(BaseModel):
     description: Optional[str] = Field(None, max_length=500)
     enabled: Optional[bool] = True
     
-    @validator('reservoir_id')
+    @field_validator('reservoir_id')
+    @classmethod
     def clean_reservoir_id(cls, v):
         """Clean reservoir_id"""
         return v.strip().upper()
     
-    @validator('location', 'description')
+    @field_validator('location', 'description')
+    @classmethod
     def clean_text_fields(cls, v):
         """Clean text fields"""
         if v is not None:
@@ -118,17 +132,18 @@ class TimeRangeQuery(BaseModel):
     hours: Optional[int] = Field(24, ge=1, le=8760, description="Hours of data to retrieve (max 1 year)")
     reservoir_id: Optional[str] = Field(None, max_length=100)
     
-    @validator('hours')
+    @field_validator('hours')
+    @classmethod
     def validate_hours(cls, v):
         """Validate reasonable hours range"""
-        if v > 720:  # 30 days
+        # Explicit null reaches field validators in v2 (v1 skipped them)
+        if v is not None and v > 720:  # 30 days
             raise ValueError('Not recommended to query more than 30 days (720 hours) of data')
         return v
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "hours": 24,
-                "reservoir_id": "EMBALSE_01"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "hours": 24,
+            "reservoir_id": "EMBALSE_01"
         }
+    })
@@ -4,23 +4,35 @@ Pydantic models for user management and authentication
 """
 
 from typing import Optional, Any
-from pydantic import BaseModel, EmailStr, Field, ConfigDict, field_validator
+from pydantic import BaseModel, EmailStr, Field, ConfigDict
 from bson import ObjectId
 
 
 class PyObjectId(str):
     """Custom ObjectId type for Pydantic v2"""
     
+    # Built on the first model that uses the type, then shared by every other
+    _core_schema = None
+    
     @classmethod
     def __get_pydantic_core_schema__(cls, source_type: Any, handler):
-        from pydantic_core import core_schema
-        return core_schema.union_schema([
-            core_schema.is_instance_schema(ObjectId),
-            core_schema.chain_schema([
-                core_schema.str_schema(),
-                core_schema.no_info_plain_validator_function(cls.validate),
-            ])
-        ])
+        if cls._core_schema is None:
+            from pydantic_core import core_schema
+            from_str = core_schema.no_info_after_validator_function(cls.validate, core_schema.str_schema())
+            # ObjectIds straight from Mongo are converted to their hex string,
+            # so the validated value is always a plain str (no custom serializer
+            # needed); JSON input and the JSON schema only ever see strings
+            cls._core_schema = core_schema.json_or_python_schema(
+                json_schema=from_str,
+                python_schema=core_schema.union_schema([
+                    core_schema.chain_schema([
+                        core_schema.is_instance_schema(ObjectId),
+                        core_schema.no_info_plain_validator_function(str),
+                    ]),
+                    from_str,
+                ]),
+            )
+        return cls._core_schema
     
     @classmethod
     def validate(cls, v):
@@ -29,13 +41,21 @@ class PyObjectId(str):
         return str(v)
 
 
+# Small value types built once per request and never modified afterwards
+_VALUE_CONFIG = ConfigDict(frozen=True, extra='forbid')
+
+
 class TokenData(BaseModel):
     """JWT token payload data"""
+    model_config = _VALUE_CONFIG
+    
     email: Optional[str] = None
 
 
 class Token(BaseModel):
     """JWT access token response"""
+    model_config = _VALUE_CONFIG
+    
     access_token: str
     token_type: str
 
@@ -66,34 +86,29 @@ class UserUpdate(BaseModel):
 
 class UserPublic(UserBase):
     """Public user model with ID - returned in API responses"""
-    id: str = Field(alias='_id')
+    id: PyObjectId = Field(alias='_id')
     
-    model_config = ConfigDict(
-        populate_by_name=True,
-        arbitrary_types_allowed=True,
-        json_encoders={ObjectId: str}
-    )
-    
-    @field_validator('id', mode='before')
-    @classmethod
-    def convert_objectid_to_str(cls, v):
-        if isinstance(v, ObjectId):
-            return str(v)
-        return v
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class ForgotPasswordRequest(BaseModel):
     """Request model for password reset request"""
+    model_config = _VALUE_CONFIG
+    
     email: EmailStr
 
 
 class ResetPasswordRequest(BaseModel):
     """Request model for password reset confirmation"""
+    model_config = _VALUE_CONFIG
+    
     token: str
     new_password: str
 
 
 class ChangePasswordRequest(BaseModel):
     """Request model for changing password while authenticated"""
+    model_config = _VALUE_CONFIG
+    
     old_password: str
     new_password: str
@@ -4,15 +4,22 @@ Data access layer for alerts collection
 Implements IAlertRepository interface
 """
 
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional, Dict, Any
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
 from app.config import alerts_collection, alert_history_collection
 from .base_repository import BaseRepository
 import logging
-import asyncio
+import os
 
 logger = logging.getLogger(__name__)
 
+# A dismissal claims an alert (dismissal_id) before archiving it, so only one
+# dismissal archives each alert; a claim left by a crashed worker expires
+DISMISSAL_CLAIM_TTL = timedelta(minutes=5)
+
 
 class AlertRepository(BaseRepository):
     """
@@ -24,12 +31,17 @@ class AlertRepository(BaseRepository):
         super().__init__(alerts_collection)
         self.history_collection = alert_history_collection
     
-    async def get_active_alerts(self, limit: int = 100) -> List[Dict[str, Any]]:
+    async def get_active_alerts(
+        self,
+        limit: int = 100,
+        projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Get all active (unresolved) alerts
         
         Args:
             limit: Maximum number of alerts to return
+            projection: Fields to fetch, e.g. only those a response model reads
             
         Returns:
             List of active alert documents
@@ -37,15 +49,21 @@ class AlertRepository(BaseRepository):
         return await self.find_many(
             query={"is_resolved": False},
             limit=limit,
-            sort=[("created_at", -1)]
+            sort=[("created_at", -1)],
+            projection=projection
         )
     
-    async def get_critical_alerts(self, limit: int = 100) -> List[Dict[str, Any]]:
+    async def get_critical_alerts(
+        self,
+        limit: int = 100,
+        projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Get critical level alerts
         
         Args:
             limit: Maximum number of alerts
+            projection: Fields to fetch (None returns whole documents)
             
         Returns:
             List of critical alerts
@@ -53,7 +71,8 @@ class AlertRepository(BaseRepository):
         return await self.find_many(
             query={"level": {"$in": ["critical", "crítica", "crítico"]}},
             limit=limit,
-            sort=[("created_at", -1)]
+            sort=[("created_at", -1)],
+            projection=projection
         )
     
     async def dismiss_alert(
@@ -79,134 +98,214 @@ class AlertRepository(BaseRepository):
             # Use provided timestamp or default to now (timezone-aware UTC)
             resolved_time = dismissed_at or datetime.now(timezone.utc)
 
-            # Use find_by_id helper to correctly handle ObjectId or string id
-            # normalize to string when passing to helper
-            try:
-                alert = await self.find_by_id(str(alert_id))
-            except Exception:
-                alert = None
-            
+            # Claim the alert so a concurrent dismissal cannot archive it too
+            claim = os.urandom(8).hex()
+            alert = await self._claim_by_id(str(alert_id), claim)
             if not alert:
                 return False
-            
-            # Update alert as resolved
-            update = {
-                "$set": {
-                    "is_resolved": True,
-                    "status": "dismissed",
-                    "resolved_at": resolved_time,
-                    "resolved_by": dismissed_by,
-                    "dismissal_reason": reason
-                }
-            }
-            
-            success = await self.update_one(
-                {"_id": alert.get("_id")},
-                update
-            )
 
-            if success:
-                # Schedule moving to history and deletion in background to keep API responsive.
-                # Build the coroutine first and pass it to create_task; if scheduling fails
-                # the created coroutine must be closed to avoid "coroutine was never awaited" warnings.
-                coro = None
-                try:
-                    coro = self._async_move_and_delete(alert, dismissed_by, reason)
-                    asyncio.create_task(coro)
-                except Exception:
-                    # If scheduling the background task failed, make sure to close the
-                    # coroutine object to avoid resource warnings, then perform the
-                    # move/delete synchronously as a fallback.
-                    try:
-                        if coro is not None:
-                            coro.close()
-                    except Exception:
-                        logger.exception("Failed closing coroutine after create_task failure")
+            # History first: if the insert fails the claim is released and
+            # the alert stays active rather than being lost
+            alert["resolved_at"] = resolved_time
+            history_doc = self._history_doc(alert, dismissed_by, reason, datetime.now(timezone.utc))
+            try:
+                await self.history_collection.insert_one(history_doc)
+            except Exception:
+                await self._release_claim([alert["_id"]], claim)
+                raise
 
-                    # Fallback to synchronous move if scheduling fails
-                    await self._move_to_history(alert, dismissed_by, reason)
-                    await self.delete_one({"_id": alert.get("_id")})
-            
-            return success
+            await self.collection.delete_one({"_id": alert["_id"], "dismissal_id": claim})
+            logger.info(f"Alert moved to history: {history_doc['alert_id']} ({history_doc['resolution_type']})")
+            return True
             
         except Exception as e:
             logger.error(f"Error dismissing alert {alert_id}: {e}")
             return False
     
-    async def _move_to_history(
-        self, 
-        alert: Dict[str, Any],
-        dismissed_by: str,
-        reason: Optional[str]
-    ) -> None:
-        """Move dismissed alert to history collection"""
+    @staticmethod
+    def _claimable(now: datetime) -> Dict[str, Any]:
+        """Filter for alerts no other dismissal currently holds"""
+        return {"$or": [
+            {"dismissal_id": {"$exists": False}},
+            {"dismissal_claimed_at": {"$lt": now - DISMISSAL_CLAIM_TTL}}
+        ]}
+    
+    async def _claim_by_id(self, alert_id: str, claim: str) -> Optional[Dict[str, Any]]:
+        """
+        Mark an active alert as being dismissed under `claim` and return it
+        
+        Matches like find_by_id: as an ObjectId first, then by the string `id`
+        field. None if no such alert exists or another dismissal holds it
+        """
+        now = datetime.now(timezone.utc)
+        update = {"$set": {"dismissal_id": claim, "dismissal_claimed_at": now}}
+        matches = [{"id": alert_id}]
+        if ObjectId.is_valid(alert_id):
+            matches.insert(0, {"_id": ObjectId(alert_id)})
+        for match in matches:
+            alert = await self.collection.find_one_and_update(
+                {"$and": [match, self._claimable(now)]},
+                update,
+                return_document=ReturnDocument.AFTER
+            )
+            if alert:
+                return alert
+        return None
+    
+    async def _release_claim(self, ids: List[Any], claim: str) -> None:
+        """Give claimed alerts back (best effort; an unreleased claim expires)"""
         try:
-            current_time = datetime.now(timezone.utc)
-            alert_id_str = str(alert.get("_id"))
-            
-            # Calculate duration if created_at exists
-            duration_minutes = None
-            created_at = alert.get("created_at")
-            if created_at:
-                if isinstance(created_at, datetime):
-                    # If stored datetime is naive, assume UTC
-                    if getattr(created_at, 'tzinfo', None) is None:
-                        try:
-                            created_at = created_at.replace(tzinfo=timezone.utc)
-                        except Exception:
-                            pass
-                    try:
-                        duration = current_time - created_at
-                        duration_minutes = int(duration.total_seconds() / 60)
-                    except Exception:
-                        duration_minutes = None
-            
-            # Determine resolution type based on who dismissed
-            resolution_type = "manual_dismiss"
-            if dismissed_by in ("system_auto", "system@auto", "system"):
-                resolution_type = "auto_resolved"
+            await self.collection.update_many(
+                {"_id": {"$in": ids}, "dismissal_id": claim},
+                {"$unset": {"dismissal_id": "", "dismissal_claimed_at": ""}}
+            )
+        except Exception as e:
+            logger.error(f"Error releasing dismissal claim {claim}: {e}")
+    
+    async def dismiss_alerts_bulk(
+        self,
+        alert_ids: List[str],
+        dismissed_by: str,
+        dismissed_at: Optional[datetime] = None,
+        reason: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Dismiss several active alerts with one claim, one insert_many and one delete_many
+        
+        IDs match like find_by_id (ObjectId or the string `id` field); unknown,
+        already resolved and concurrently claimed alerts are skipped. History
+        is written before the active documents are deleted, so a failed insert
+        loses nothing
+        
+        Args:
+            alert_ids: Alert IDs
+            dismissed_by: Email of user dismissing
+            dismissed_at: Optional timestamp of dismissal (defaults to now)
+            reason: Optional reason for dismissal
             
-            history_doc = {
-                "alert_id": alert_id_str,
-                "type": alert.get("type"),
-                "level": alert.get("level"),
-                "title": alert.get("title"),
-                "message": alert.get("message"),
-                "value": alert.get("value"),
-                "threshold_info": alert.get("threshold_info", ""),
-                "location": alert.get("location", "Sistema de Riego"),
-                "sensor_id": alert.get("sensor_id"),
-                "created_at": (created_at if isinstance(created_at, datetime) else alert.get("created_at", current_time)),
-                "resolved_at": alert.get("resolved_at", current_time),
-                "dismissed_at": current_time,
-                "dismissed_by": dismissed_by,
-                "dismissed_by_role": alert.get("dismissed_by_role", "system" if dismissed_by.startswith("system") else "operario"),
-                "resolution_type": resolution_type,
-                "duration_minutes": duration_minutes,
-                "dismissal_reason": reason,
-                "archived_at": current_time
-            }
+        Returns:
+            The dismissed alert documents
+        """
+        try:
+            resolved_time = dismissed_at or datetime.now(timezone.utc)
+            object_ids = [ObjectId(alert_id) for alert_id in alert_ids if ObjectId.is_valid(alert_id)]
             
-            await self.history_collection.insert_one(history_doc)
-            logger.info(f"Alert moved to history: {alert_id_str} ({resolution_type})")
+            alerts = await self._archive_many(
+                {"$or": [{"_id": {"$in": object_ids}}, {"id": {"$in": list(alert_ids)}}]},
+                dismissed_by, resolved_time, reason
+            )
+            logger.info(f"Dismissed {len(alerts)} alerts in bulk by {dismissed_by}")
+            return alerts
             
         except Exception as e:
-            logger.error(f"Error moving alert to history: {e}")
-            import traceback
-            traceback.print_exc()
-
-    async def _async_move_and_delete(self, alert: Dict[str, Any], dismissed_by: str, reason: Optional[str]) -> None:
-        """Background helper: move to history and delete the active alert."""
+            logger.error(f"Error bulk dismissing {len(alert_ids)} alerts: {e}")
+            return []
+    
+    async def _archive_many(
+        self,
+        query: Dict[str, Any],
+        dismissed_by: str,
+        resolved_time: datetime,
+        reason: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Archive the unresolved alerts matching `query` and return those archived
+        
+        The alerts are claimed in one update_many and read back by the claim,
+        so concurrent calls never archive the same alert twice. History goes in
+        one unordered insert_many; only alerts whose history was written are
+        deleted, the rest are released and stay active
+        """
+        claim = os.urandom(8).hex()
+        now = datetime.now(timezone.utc)
+        await self.collection.update_many(
+            {"$and": [query, {"is_resolved": {"$ne": True}}, self._claimable(now)]},
+            {"$set": {"dismissal_id": claim, "dismissal_claimed_at": now}}
+        )
+        alerts = await self.collection.find({"dismissal_id": claim}).to_list(length=None)
+        if not alerts:
+            return []
+        
+        history_docs = []
+        for alert in alerts:
+            alert["resolved_at"] = resolved_time
+            history_docs.append(self._history_doc(alert, dismissed_by, reason, now))
+        
         try:
-            await self._move_to_history(alert, dismissed_by, reason)
-            await self.delete_one({"_id": alert.get("_id")})
-        except Exception as e:
-            logger.error(f"Background move/delete failed for alert {alert.get('_id')}: {e}")
+            await self.history_collection.insert_many(history_docs, ordered=False)
+            archived = alerts
+        except BulkWriteError as e:
+            failed = {error["index"] for error in e.details.get("writeErrors", [])}
+            archived = [alert for i, alert in enumerate(alerts) if i not in failed]
+            logger.error(f"History insert failed for {len(failed)} of {len(alerts)} alerts: {e}")
+            await self._release_claim([alerts[i]["_id"] for i in failed], claim)
+        except Exception:
+            await self._release_claim([alert["_id"] for alert in alerts], claim)
+            raise
+        
+        if archived:
+            await self.collection.delete_many({
+                "_id": {"$in": [alert["_id"] for alert in archived]},
+                "dismissal_id": claim
+            })
+        return archived
+    
+    @staticmethod
+    def _history_doc(
+        alert: Dict[str, Any],
+        dismissed_by: str,
+        reason: Optional[str],
+        current_time: datetime
+    ) -> Dict[str, Any]:
+        """Build the history document for a dismissed alert"""
+        # Calculate duration if created_at exists
+        duration_minutes = None
+        created_at = alert.get("created_at")
+        if created_at:
+            if isinstance(created_at, datetime):
+                # If stored datetime is naive, assume UTC
+                if getattr(created_at, 'tzinfo', None) is None:
+                    try:
+                        created_at = created_at.replace(tzinfo=timezone.utc)
+                    except Exception:
+                        pass
+                try:
+                    duration = current_time - created_at
+                    duration_minutes = int(duration.total_seconds() / 60)
+                except Exception:
+                    duration_minutes = None
+        
+        # Determine resolution type based on who dismissed
+        resolution_type = "manual_dismiss"
+        if dismissed_by in ("system_auto", "system@auto", "system"):
+            resolution_type = "auto_resolved"
+        
+        return {
+            "alert_id": str(alert.get("_id")),
+            "type": alert.get("type"),
+            "level": alert.get("level"),
+            "title": alert.get("title"),
+            "message": alert.get("message"),
+            "value": alert.get("value"),
+            "threshold_info": alert.get("threshold_info", ""),
+            "location": alert.get("location", "Sistema de Riego"),
+            "sensor_id": alert.get("sensor_id"),
+            "created_at": (created_at if isinstance(created_at, datetime) else alert.get("created_at", current_time)),
+            "resolved_at": alert.get("resolved_at", current_time),
+            "dismissed_at": current_time,
+            "dismissed_by": dismissed_by,
+            "dismissed_by_role": alert.get("dismissed_by_role", "system" if dismissed_by.startswith("system") else "operario"),
+            "resolution_type": resolution_type,
+            "duration_minutes": duration_minutes,
+            "dismissal_reason": reason,
+            "archived_at": current_time
+        }
     
     async def get_alerts_by_sensor(
         self, 
         sensor_id: str,
-        limit: int = 50
+        limit: int = 50,
+        projection: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
         """
         Get alerts for specific sensor
@@ -214,6 +313,7 @@ class AlertRepository(BaseRepository):
         Args:
             sensor_id: Sensor identifier
             limit: Maximum alerts to return
+            projection: Fields to fetch (None returns whole documents)
             
         Returns:
             List of alerts
@@ -221,7 +321,8 @@ class AlertRepository(BaseRepository):
         return await self.find_many(
             query={"sensor_id": sensor_id},
             limit=limit,
-            sort=[("created_at", -1)]
+            sort=[("created_at", -1)],
+            projection=projection
         )
 
     async def archive_measurement_alerts_for_sensor(self, sensor_id: str) -> int:
@@ -233,34 +334,13 @@ class AlertRepository(BaseRepository):
         try:
             # Temporarily remove 'water_level' from measurement types while feature is disabled
             measurement_types = ['ph', 'ph_range', 'temperature', 'ec', 'conductivity']
-            cursor = self.collection.find({
-                'sensor_id': sensor_id,
-                'type': {'$in': measurement_types},
-                'is_resolved': False
-            })
-
-            to_archive = await cursor.to_list(length=None)
-            count = 0
-            for alert in to_archive:
-                try:
-                    # Mark as resolved and move to history
-                    alert_id = alert.get('_id')
-                    now = datetime.now(timezone.utc)
-                    await self.update_one({'_id': alert_id}, {'$set': {
-                        'is_resolved': True,
-                        'status': 'auto_resolved',
-                        'resolved_at': now,
-                        'resolved_by': 'system',
-                        'dismissal_reason': 'Sensor disconnected - auto-archived'
-                    }})
-
-                    # Move to history synchronously
-                    await self._move_to_history(alert, 'system', 'Sensor disconnected - auto-archived')
-                    await self.delete_one({'_id': alert_id})
-                    count += 1
-                except Exception:
-                    logger.exception(f"Failed to archive alert {alert.get('_id')} for sensor {sensor_id}")
-                    continue
+            # Same batch path as dismiss_alerts_bulk: one claim, one history
+            # insert and one delete for all of the sensor's alerts
+            archived = await self._archive_many(
+                {'sensor_id': sensor_id, 'type': {'$in': measurement_types}, 'is_resolved': False},
+                'system', datetime.now(timezone.utc), 'Sensor disconnected - auto-archived'
+            )
+            count = len(archived)
 
             logger.info(f"Archived {count} measurement alerts for sensor {sensor_id}")
             return count
@@ -271,7 +351,8 @@ class AlertRepository(BaseRepository):
     async def get_alerts_history(
         self,
         days: int = 30,
-        limit: int = 100
+        limit: int = 100,
+        projection: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
         """
         Get alert history for specified days
@@ -279,19 +360,36 @@ class AlertRepository(BaseRepository):
         Args:
             days: Number of days to look back
             limit: Maximum alerts
+            projection: Fields to fetch (None returns whole documents)
             
         Returns:
             List of historical alerts
         """
-        from datetime import timedelta
+        return await self._history_cursor(days, limit, projection).to_list(length=limit)
+
+    async def iter_alerts_history(
+        self,
+        days: int = 30,
+        limit: int = 100,
+        projection: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield alert history documents as the cursor delivers them
         
+        Same query as get_alerts_history, without holding the whole result in
+        a list: callers can start writing a response while later batches are
+        still being fetched
+        """
+        async for doc in self._history_cursor(days, limit, projection):
+            yield doc
+
+    def _history_cursor(self, days: int, limit: int, projection: Optional[Dict[str, Any]]) -> Any:
+        """History created in the last `days` days, newest first"""
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
         
-        cursor = self.history_collection.find({
+        return self.history_collection.find({
             "created_at": {"$gte": cutoff_date}
-        }).sort("created_at", -1).limit(limit)
-        
-        return await cursor.to_list(length=limit)
+        }, projection).sort("created_at", -1).limit(limit)
 
     async def create_alert(self, alert_doc: Dict[str, Any]) -> Optional[str]:
         """
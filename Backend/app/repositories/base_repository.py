@@ -3,8 +3,10 @@ Base Repository
 Generic repository implementing common CRUD operations (DRY principle)
 """
 
-from typing import TypeVar, Generic, Optional, List, Dict, Any
+from typing import TypeVar, Generic, Optional, List, Dict, Any, Callable
 from abc import ABC, abstractmethod
+from functools import wraps
+import hashlib
 from motor.motor_asyncio import AsyncIOMotorCollection
 from bson import ObjectId
 import logging
@@ -13,6 +15,56 @@ logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+_cache_service = None
+
+
+def _get_cache_service():
+    """Resolve the cache service on first use and keep it"""
+    global _cache_service
+    if _cache_service is None:
+        # Not imported at module level: app.services imports the repositories at package load
+        from app.services.cache import cache_service
+        _cache_service = cache_service
+    return _cache_service
+
+
+def cached_read(namespace: str, ttl: int = 30, on_error: Optional[Callable[[], Any]] = None):
+    """
+    Cache a repository read method in Redis
+    
+    The key is `<namespace>:<blake2b of the call arguments>`, so write paths
+    can drop every cached read at once with cache_service.delete_prefix(namespace).
+    Falls through to the database when Redis is disabled or unreachable.
+    
+    The decorated method should let database errors raise: nothing is cached
+    for a failed read, and the error is logged and answered with on_error()
+    (or re-raised when on_error is None).
+    
+    Usage:
+    @cached_read("sensor_data", ttl=30, on_error=list)
+    async def get_sensor_data(self, sensor_id: str, limit: int = 100):
+        # ...
+    """
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            params = repr((func.__name__, args, sorted(kwargs.items())))
+            digest = hashlib.blake2b(params.encode(), digest_size=16).hexdigest()
+            try:
+                return await _get_cache_service().get_or_set(
+                    f"{namespace}:{digest}",
+                    lambda: func(self, *args, **kwargs),
+                    ttl
+                )
+            except Exception as e:
+                if on_error is None:
+                    raise
+                logger.error(f"Error in {func.__qualname__}: {e}")
+                return on_error()
+        
+        return wrapper
+    return decorator
+
 
 class BaseRepository(ABC, Generic[T]):
     """
@@ -76,7 +128,8 @@ class BaseRepository(ABC, Generic[T]):
         self, 
         query: Dict[str, Any],
         limit: int = 100,
-        sort: Optional[List[tuple]] = None
+        sort: Optional[List[tuple]] = None,
+        projection: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
         """
         Find multiple documents matching query
@@ -85,17 +138,19 @@ class BaseRepository(ABC, Generic[T]):
             query: MongoDB query dict
             limit: Maximum number of documents
             sort: Sort specification (e.g., [("created_at", -1)])
+            projection: Fields to return (None returns whole documents)
             
         Returns:
             List of documents
         """
         try:
-            cursor = self.collection.find(query)
+            cursor = self.collection.find(query, projection)
             
             if sort:
                 cursor = cursor.sort(sort)
             
-            return await cursor.to_list(length=limit)
+            # Limit on the server too, so no batch carries unused documents
+            return await cursor.limit(limit).to_list(length=limit)
             
         except Exception as e:
             logger.error(f"Error in find_many: {e}")
@@ -7,7 +7,7 @@ Implements ISensorRepository interface
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timezone
 from app.config.database import db
-from .base_repository import BaseRepository
+from .base_repository import BaseRepository, cached_read
 import logging
 
 logger = logging.getLogger(__name__)
@@ -147,6 +147,7 @@ class SensorRepository(BaseRepository):
             logger.error(f"Error creating sensor: {e}")
             return None
     
+    @cached_read("sensor_data", ttl=30, on_error=list)
     async def get_sensor_data(
         self,
         sensor_id: str,
@@ -162,15 +163,12 @@ class SensorRepository(BaseRepository):
         Returns:
             List of sensor data documents
         """
-        try:
-            cursor = self.sensor_data_collection.find({
-                "SensorID": sensor_id
-            }).sort("ProcessedAt", -1).limit(limit)
-            
-            return await cursor.to_list(length=limit)
-        except Exception as e:
-            logger.error(f"Error getting sensor data: {e}")
-            return []
+        # Errors propagate to cached_read, which answers [] without caching it
+        cursor = self.sensor_data_collection.find({
+            "SensorID": sensor_id
+        }).sort("ProcessedAt", -1).limit(limit)
+        
+        return await cursor.to_list(length=limit)
     
     async def get_sensors_with_alert_config(self) -> List[Dict[str, Any]]:
         """
@@ -184,6 +182,7 @@ class SensorRepository(BaseRepository):
             limit=1000
         )
     
+    @cached_read("sensor_data", ttl=30, on_error=lambda: None)
     async def get_latest_reading(self, sensor_id: str) -> Optional[Dict[str, Any]]:
         """
         Get the most recent reading for a sensor
@@ -194,16 +193,13 @@ class SensorRepository(BaseRepository):
         Returns:
             Most recent data document or None
         """
-        try:
-            cursor = self.sensor_data_collection.find({
-                "SensorID": sensor_id
-            }).sort("ProcessedAt", -1).limit(1)
-            
-            results = await cursor.to_list(length=1)
-            return results[0] if results else None
-        except Exception as e:
-            logger.error(f"Error getting latest reading for {sensor_id}: {e}")
-            return None
+        # Errors propagate to cached_read, which answers None without caching it
+        cursor = self.sensor_data_collection.find({
+            "SensorID": sensor_id
+        }).sort("ProcessedAt", -1).limit(1)
+        
+        results = await cursor.to_list(length=1)
+        return results[0] if results else None
 
 
 # Singleton instance
@@ -8,12 +8,14 @@ from datetime import datetime, timezone
 from typing import List, Optional
 from bson import ObjectId
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
 import logging
+import orjson
 
 # Import alert models
 from app.models.alert_models import (
     AlertThresholds, ActiveAlert, AlertHistory, AlertSummary,
-    AlertConfigUpdateRequest, DismissAlertRequest, AlertStatus
+    AlertConfigUpdateRequest, DismissAlertRequest, DismissAlertsBulkRequest, AlertStatus
 )
 
 from app.config import (
@@ -28,6 +30,13 @@ from app.repositories.alert_repository import alert_repository
 
 logger = logging.getLogger(__name__)
 
+# /active validates each document into ActiveAlert, so only its fields
+# (plus _id, which Mongo returns by default) are fetched
+ACTIVE_ALERT_PROJECTION = {field: 1 for field in ActiveAlert.model_fields}
+# Same for /history; "resolution" is the legacy field the service falls
+# back to when resolution_type is missing
+ALERT_HISTORY_PROJECTION = {field: 1 for field in (*AlertHistory.model_fields, "resolution")}
+
 router = APIRouter(prefix="/api/alerts", tags=["Alertas"])
 
 
@@ -41,7 +50,7 @@ async def get_active_alerts(current_user: dict = Depends(get_current_user)):
     """
     try:
         # Delegate to alert service
-        alerts_list = await alert_service.get_active_alerts(limit=100)
+        alerts_list = await alert_service.get_active_alerts(limit=100, projection=ACTIVE_ALERT_PROJECTION)
         
         # Convert to ActiveAlert models
         active_alerts = []
@@ -150,6 +159,57 @@ async def dismiss_alert(
         )
 
 
+@router.post("/dismiss-bulk")
+async def dismiss_alerts_bulk(
+    fastapi_request: Request,
+    request: DismissAlertsBulkRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Dismiss/close several alerts at once
+    
+    Moves every matching active alert to history in one batch.
+    Unknown or already resolved IDs are returned under "not_found".
+    Available to operators and admins.
+    """
+    user_email = current_user.get("email")
+    user_role = current_user.get("role", "operario")
+    
+    try:
+        result = await alert_service.dismiss_alerts_bulk(
+            alert_ids=request.alert_ids,
+            user_email=user_email,
+            user_role=user_role,
+            reason=request.reason
+        )
+        
+        # Log audit event (one per batch)
+        client_ip = fastapi_request.client.host if fastapi_request.client else None
+        await log_audit_event(
+            action=AuditAction.ALERT_DISMISSED,
+            description=f"Alerts dismissed in bulk: {len(result['dismissed'])}",
+            user_email=user_email,
+            user_id=str(current_user.get('_id')) if current_user.get('_id') else None,
+            resource_type="alert",
+            details={
+                "alert_ids": result["dismissed"],
+                "not_found": result["not_found"]
+            },
+            ip_address=client_ip,
+            user_agent=fastapi_request.headers.get("user-agent", None),
+            success=True
+        )
+        
+        return result
+        
+    except Exception as e:
+        logger.error(f"Unexpected error dismissing alerts in bulk: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Internal server error"
+        )
+
+
 @router.get("/history")
 async def get_alert_history(
     limit: int = Query(50, ge=1, le=200),
@@ -163,7 +223,7 @@ async def get_alert_history(
     """
     try:
         # Delegate to alert service
-        history_list = await alert_service.get_alert_history(limit=limit)
+        history_list = await alert_service.get_alert_history(limit=limit, projection=ALERT_HISTORY_PROJECTION)
         
         # Convert to AlertHistory models
         history_items = []
@@ -181,6 +241,33 @@ async def get_alert_history(
         return []
 
 
+@router.get("/history/stream")
+async def stream_alert_history(
+    days: int = Query(30, ge=1, le=365),
+    limit: int = Query(1000, ge=1, le=10000),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Stream alert history as NDJSON (one JSON document per line)
+    
+    For large exports: rows are written as Mongo delivers them instead of
+    being collected into one list first, so memory stays flat in `limit`.
+    
+    Args:
+        days: Days to look back (1-365)
+        limit: Maximum number of records (1-10000)
+    """
+    async def ndjson_lines():
+        async for doc in alert_repository.iter_alerts_history(days=days, limit=limit):
+            # ObjectIds become strings; stored naive datetimes are UTC
+            yield orjson.dumps(
+                doc, default=str,
+                option=orjson.OPT_NAIVE_UTC | orjson.OPT_APPEND_NEWLINE
+            )
+    
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
 @router.delete("/history/clear")
 async def clear_alert_history(admin_user: dict = Depends(get_current_admin_user)):
     """
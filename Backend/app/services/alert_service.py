@@ -37,18 +37,24 @@ class AlertService:
         self.sensor_repo = sensor_repo or sensor_repository
         self.notif_service = notif_service or notification_service
     
-    async def get_active_alerts(self, limit: int = 100) -> List[Dict[str, Any]]:
+    async def get_active_alerts(
+        self,
+        limit: int = 100,
+        projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Get all active (unresolved) alerts
         
         Args:
             limit: Maximum number of alerts to return
+            projection: Fields to fetch; callers that validate the documents
+                into a response model only need that model's fields
             
         Returns:
             List of active alert dictionaries
         """
         try:
-            alerts = await self.alert_repo.get_active_alerts(limit=limit)
+            alerts = await self.alert_repo.get_active_alerts(limit=limit, projection=projection)
             logger.info(f"Retrieved {len(alerts)} active alerts")
             return alerts
         except Exception as e:
@@ -150,6 +156,59 @@ class AlertService:
             logger.error(f"Error dismissing alert {alert_id}: {e}")
             raise RuntimeError(f"Failed to dismiss alert: {e}")
     
+    async def dismiss_alerts_bulk(
+        self,
+        alert_ids: List[str],
+        user_email: str,
+        user_role: str = "operario",
+        reason: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Dismiss several alerts at once and move them to history
+        
+        Same rules as dismiss_alert, applied in a handful of database round
+        trips instead of several per alert. Unknown and already resolved
+        alerts are reported back rather than failing the whole request
+        
+        Args:
+            alert_ids: Alert identifiers (_id or custom id field)
+            user_email: Email of user dismissing the alerts
+            user_role: Role of user (operario, admin)
+            reason: Optional reason for dismissal
+            
+        Returns:
+            Dictionary with the dismissed and not found IDs
+        """
+        current_time = datetime.now(timezone.utc)
+        dismissed = await self.alert_repo.dismiss_alerts_bulk(
+            alert_ids=alert_ids,
+            dismissed_by=user_email,
+            dismissed_at=current_time,
+            reason=reason
+        )
+        
+        for alert_doc in dismissed:
+            await self._clear_alert_notifications(alert_doc)
+        
+        # Report IDs in the caller's terms (either _id or custom id matched)
+        matched = set()
+        for alert_doc in dismissed:
+            matched.add(str(alert_doc.get("_id")))
+            if alert_doc.get("id"):
+                matched.add(str(alert_doc["id"]))
+        dismissed_ids = [alert_id for alert_id in alert_ids if alert_id in matched]
+        not_found = [alert_id for alert_id in alert_ids if alert_id not in matched]
+        
+        logger.info(f"{len(dismissed)} alerts dismissed in bulk by {user_email} ({user_role})")
+        
+        return {
+            "message": f"{len(dismissed)} alerts dismissed successfully",
+            "dismissed": dismissed_ids,
+            "not_found": not_found,
+            "dismissed_at": current_time.isoformat(),
+            "dismissed_by": user_email
+        }
+    
     async def get_alert_statistics(self) -> Dict[str, Any]:
         """
         Get alert statistics and aggregations
@@ -201,7 +260,8 @@ class AlertService:
         self,
         limit: int = 50,
         sensor_id: Optional[str] = None,
-        alert_type: Optional[str] = None
+        alert_type: Optional[str] = None,
+        projection: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
         """
         Get alert history with optional filters
@@ -210,6 +270,8 @@ class AlertService:
             limit: Maximum records to return
             sensor_id: Filter by sensor (optional)
             alert_type: Filter by alert type (optional)
+            projection: Fields to fetch (None returns whole documents);
+                must include "resolution" for the legacy fallback below
             
         Returns:
             List of historical alert dictionaries
@@ -225,7 +287,7 @@ class AlertService:
                 query_filter["type"] = alert_type
             
             # Query history
-            cursor = alert_history_collection.find(query_filter)\
+            cursor = alert_history_collection.find(query_filter, projection)\
                 .sort("dismissed_at", -1)\
                 .limit(limit)
             
@@ -1,11 +1,13 @@
 # app/services/cache.py
 import json
 import logging
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, Optional
 from datetime import timedelta
 from functools import wraps
 import hashlib
 
+from bson import json_util
+
 try:
     import redis.asyncio as redis  # type: ignore
     REDIS_AVAILABLE = True
@@ -127,6 +129,49 @@ class CacheService:
             logger.error(f"Cache DELETE PATTERN error: {str(e)}")
             return False
     
+    async def delete_prefix(self, prefix: str):
+        """Delete all keys under a namespace prefix (incremental SCAN, non-blocking)"""
+        if not self.enabled or not self.redis_client:
+            return False
+        
+        try:
+            keys = [key async for key in self.redis_client.scan_iter(match=f"{prefix}*", count=500)]
+            if keys:
+                await self.redis_client.delete(*keys)
+                logger.debug(f"Cache DELETE PREFIX: {prefix} ({len(keys)} keys)")
+            return True
+        except Exception as e:
+            logger.error(f"Cache DELETE PREFIX error: {str(e)}")
+            return False
+    
+    async def get_or_set(self, key: str, factory: Callable[[], Awaitable[Any]], ttl: int) -> Any:
+        """
+        Return the cached value for key, or await factory() and cache its result.
+        
+        Values go through BSON extended JSON so datetimes and ObjectIds come
+        back with the same types Motor returned for the uncached call.
+        """
+        if not self.enabled or not self.redis_client:
+            return await factory()
+        
+        try:
+            raw = await self.redis_client.get(key)
+            if raw is not None:
+                logger.debug(f"Cache HIT: {key}")
+                return json_util.loads(raw)
+        except Exception as e:
+            logger.error(f"Cache GET error: {str(e)}")
+        
+        value = await factory()
+        
+        try:
+            await self.redis_client.setex(key, ttl, json_util.dumps(value))
+            logger.debug(f"Cache SET: {key} (TTL: {ttl}s)")
+        except Exception as e:
+            logger.error(f"Cache SET error: {str(e)}")
+        
+        return value
+    
     async def clear_all(self):
         """Clear entire cache"""
         if not self.enabled or not self.redis_client:
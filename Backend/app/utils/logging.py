@@ -5,14 +5,43 @@ Improves traceability and debugging in production
 """
 
 import logging
+import logging.handlers
+import copy
 import json
+import queue
+import time
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from contextvars import ContextVar
 
 # Context variable for request ID
 request_id_var: ContextVar[Optional[str]] = ContextVar('request_id', default=None)
 
+# Last formatted second: (epoch second, "YYYY-MM-DDTHH:MM:SS")
+_ts_second = (-1, "")
+
+
+def _utc_isoformat(created: float) -> str:
+    """
+    Same text as datetime.fromtimestamp(created, tz=timezone.utc).isoformat()
+    
+    Records logged within the same second reuse the formatted date/time part,
+    so a burst of records (e.g. a flood of 429s) builds no datetime objects
+    """
+    global _ts_second
+    second = int(created)
+    micros = round((created - second) * 1_000_000)
+    if micros >= 1_000_000:
+        second += 1
+        micros -= 1_000_000
+    cached_second, prefix = _ts_second
+    if cached_second != second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        _ts_second = (second, prefix)
+    if micros:
+        return f"{prefix}.{micros:06d}+00:00"
+    return f"{prefix}+00:00"
+
 
 class StructuredLogger:
     """
@@ -170,7 +199,7 @@ class JSONFormatter(logging.Formatter):
     
     def format(self, record: logging.LogRecord) -> str:
         log_data = {
-            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "timestamp": _utc_isoformat(record.created),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -179,8 +208,8 @@ class JSONFormatter(logging.Formatter):
             "line": record.lineno,
         }
         
-        # Add request_id if exists
-        request_id = request_id_var.get()
+        # Add request_id if exists (captured at emit time when logging via the queue)
+        request_id = getattr(record, "request_id", None) or request_id_var.get()
         if request_id:
             log_data["request_id"] = request_id
         
@@ -212,3 +241,60 @@ def configure_production_logging():
     handler.setFormatter(JSONFormatter())
     root_logger.addHandler(handler)
     root_logger.setLevel(logging.INFO)
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that captures the request ID before the record leaves the
+    event loop; context variables are not visible from the listener thread
+    
+    The record is queued unformatted. The base prepare() formats it on the
+    loop and drops exc_info/args, which would leave JSONFormatter without
+    the exception; formatting is the listener's job
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.request_id = request_id_var.get()
+        return record
+
+
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+_direct_handlers: List[logging.Handler] = []
+
+
+def start_queue_logging() -> None:
+    """
+    Move the root logger's handlers behind a queue
+    
+    Log calls on the event loop only enqueue the record; a QueueListener
+    thread does the formatting and stream/file I/O. Call once at startup,
+    after the handlers are configured, and pair with stop_queue_logging().
+    """
+    global _queue_listener, _direct_handlers
+    if _queue_listener is not None:
+        return
+    
+    root_logger = logging.getLogger()
+    _direct_handlers = root_logger.handlers[:]
+    if not _direct_handlers:
+        return
+    
+    log_queue: queue.Queue = queue.Queue(-1)
+    _queue_listener = logging.handlers.QueueListener(
+        log_queue, *_direct_handlers, respect_handler_level=True
+    )
+    root_logger.handlers = [ContextQueueHandler(log_queue)]
+    _queue_listener.start()
+
+
+def stop_queue_logging() -> None:
+    """Flush queued records and restore the root logger's direct handlers"""
+    global _queue_listener, _direct_handlers
+    if _queue_listener is None:
+        return
+    
+    _queue_listener.stop()
+    logging.getLogger().handlers = _direct_handlers
+    _queue_listener = None
+    _direct_handlers = []
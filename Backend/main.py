@@ -17,6 +17,7 @@ from app.services.cache import cache_service
 from app.middleware import RateLimitMiddleware
 from app.middleware.request_id import RequestIDMiddleware
 from app.utils.dependencies import get_current_user
+from app.utils.logging import start_queue_logging, stop_queue_logging
 from app.core import register_exception_handlers, get_container, configure_container
 
 # Configure logging level based on environment
@@ -35,6 +36,8 @@ async def lifespan(app: FastAPI):
     Handles startup and shutdown events
     """
     # Startup
+    # Hand log I/O to a background thread so it never blocks the event loop
+    start_queue_logging()
     logger.info("Starting application...")
     
     # Configure dependency injection container
@@ -42,6 +45,8 @@ async def lifespan(app: FastAPI):
     configure_container(container)
     logger.info("Dependency container configured")
     
+    await Database.initialize()
+    await Database.ensure_indexes()
     logger.info(f"Connected to database: {settings.DATABASE_NAME}")
     
     # Connect Redis cache
@@ -70,6 +75,7 @@ async def lifespan(app: FastAPI):
     await cache_service.disconnect()
     await Database.close()
     logger.info("Application closed successfully")
+    stop_queue_logging()
 
 
 app = FastAPI(
@@ -121,19 +127,18 @@ async def get_rate_limit_stats(current_user: dict = Depends(get_current_user)):
             detail="Only administrators can view rate limiting statistics"
         )
     
-    # Get rate limiting middleware instance
-    rate_limit_instance = None
-    for middleware in app.user_middleware:
-        if middleware.cls == RateLimitMiddleware:
-            # Middleware is a wrapped instance, need to access original app
-            rate_limit_instance = middleware.kwargs.get("app")
-            break
-    
-    if rate_limit_instance:
-        # Search for actual middleware instance in chain
-        for mw in app.middleware_stack.__self__.middleware:
-            if isinstance(mw, RateLimitMiddleware):
-                return mw.get_stats()
+    # Walk the built middleware chain (each layer wraps the next as .app)
+    # down to the rate limiter instance that holds the buckets
+    layer = app.middleware_stack
+    while layer is not None:
+        if isinstance(layer, RateLimitMiddleware):
+            stats = layer.get_stats()
+            # With Redis, limits are shared by every worker; report their totals too
+            shared = await layer.get_shared_stats()
+            if shared is not None:
+                stats["shared"] = shared
+            return stats
+        layer = getattr(layer, "app", None)
     
     # Fallback: return basic response
     return {
@@ -1,50 +1,194 @@
 import pytest
-import asyncio
 from datetime import datetime, timezone
 
 from app.repositories.alert_repository import alert_repository
 
 
+class FakeSingleActive:
+    """Active collection fake for the claim / insert / delete sequence"""
+
+    def __init__(self, alert, calls):
+        self.alert = alert
+        self.calls = calls
+
+    async def find_one_and_update(self, query, update, return_document=None):
+        self.calls.append(("claim", query))
+        if self.alert is None:
+            return None
+        return {**self.alert, **update["$set"]}
+
+    async def delete_one(self, query):
+        self.calls.append(("delete", query))
+
+    async def update_many(self, query, update):
+        self.calls.append(("release", query, update))
+
+
+class FakeSingleHistory:
+    def __init__(self, calls, error=None):
+        self.calls = calls
+        self.error = error
+
+    async def insert_one(self, doc):
+        self.calls.append(("insert", doc))
+        if self.error:
+            raise self.error
+
+
 @pytest.mark.asyncio
 async def test_dismiss_alert_no_alert(monkeypatch):
-    async def fake_find_by_id(self, id):
-        return None
-
-    monkeypatch.setattr("app.repositories.base_repository.BaseRepository.find_by_id", fake_find_by_id, raising=True)
+    calls = []
+    monkeypatch.setattr(alert_repository, "collection", FakeSingleActive(None, calls))
+    monkeypatch.setattr(alert_repository, "history_collection", FakeSingleHistory(calls))
 
     res = await alert_repository.dismiss_alert("nonexistent", "tester")
     assert res is False
+    # Not an ObjectId: only the string id is tried, nothing is archived
+    assert [c[0] for c in calls] == ["claim"]
 
 
 @pytest.mark.asyncio
-async def test_dismiss_alert_success_fallback_move(monkeypatch):
-    # prepare a fake alert
+async def test_dismiss_alert_writes_history_before_delete(monkeypatch):
     alert = {
         "_id": "alert-1",
         "type": "ph",
         "created_at": datetime.now(timezone.utc)
     }
+    dismissed_at = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+    calls = []
+    monkeypatch.setattr(alert_repository, "collection", FakeSingleActive(alert, calls))
+    monkeypatch.setattr(alert_repository, "history_collection", FakeSingleHistory(calls))
+
+    res = await alert_repository.dismiss_alert("alert-1", "tester", dismissed_at=dismissed_at)
+    assert res is True
+    assert [c[0] for c in calls] == ["claim", "insert", "delete"]
+    history_doc = calls[1][1]
+    assert history_doc["dismissed_by"] == "tester"
+    assert history_doc["resolved_at"] == dismissed_at
+    # Only the holder of the claim deletes the alert
+    claim = calls[2][1]["dismissal_id"]
+    assert calls[2][1] == {"_id": "alert-1", "dismissal_id": claim}
 
-    async def fake_find_by_id(self, id):
-        return alert
 
-    async def fake_update_one(self, query, update):
-        return True
+@pytest.mark.asyncio
+async def test_dismiss_alert_keeps_alert_when_history_insert_fails(monkeypatch):
+    alert = {"_id": "alert-1", "type": "ph"}
+    calls = []
+    monkeypatch.setattr(alert_repository, "collection", FakeSingleActive(alert, calls))
+    monkeypatch.setattr(alert_repository, "history_collection", FakeSingleHistory(calls, RuntimeError("insert failed")))
 
-    moved = {"called": False}
+    res = await alert_repository.dismiss_alert("alert-1", "tester")
+    assert res is False
+    # No delete: the claim is released and the alert stays active
+    assert [c[0] for c in calls] == ["claim", "insert", "release"]
+    _, query, update = calls[2]
+    assert query["_id"] == {"$in": ["alert-1"]}
+    assert "dismissal_id" in update["$unset"]
 
-    async def fake_move_to_history(self, alert_obj, dismissed_by, reason):
-        moved["called"] = True
 
-    # Force asyncio.create_task to raise so dismiss_alert falls back to synchronous move
-    def raise_create_task(coro):
-        raise RuntimeError("cannot schedule")
+class FakeBulkActive:
+    """Active collection fake: update_many claims, find reads back by claim"""
 
-    monkeypatch.setattr("app.repositories.base_repository.BaseRepository.find_by_id", fake_find_by_id, raising=True)
-    monkeypatch.setattr("app.repositories.base_repository.BaseRepository.update_one", fake_update_one, raising=True)
-    monkeypatch.setattr("app.repositories.alert_repository.AlertRepository._move_to_history", fake_move_to_history, raising=True)
-    monkeypatch.setattr("asyncio.create_task", raise_create_task, raising=False)
+    def __init__(self, alerts, calls):
+        self.alerts = alerts
+        self.calls = calls
 
-    res = await alert_repository.dismiss_alert("alert-1", "tester")
-    assert res is True
-    assert moved["called"] is True
+    async def update_many(self, query, update):
+        self.calls.append(("update_many", query, update))
+
+    def find(self, query):
+        self.calls.append(("find", query))
+        alerts = self.alerts
+
+        class Cursor:
+            async def to_list(self, length):
+                return alerts
+
+        return Cursor()
+
+    async def delete_many(self, query):
+        self.calls.append(("delete_many", query))
+
+
+class FakeBulkHistory:
+    def __init__(self, calls, error=None):
+        self.calls = calls
+        self.error = error
+
+    async def insert_many(self, docs, ordered=True):
+        self.calls.append(("insert_many", docs, ordered))
+        if self.error:
+            raise self.error
+
+
+@pytest.mark.asyncio
+async def test_dismiss_alerts_bulk_claims_then_batches_history_and_delete(monkeypatch):
+    from bson import ObjectId
+
+    oid = ObjectId()
+    alerts = [
+        {"_id": oid, "type": "ph", "created_at": datetime.now(timezone.utc)},
+        {"_id": "legacy", "id": "custom-1", "type": "temperature"},
+    ]
+    calls = []
+    monkeypatch.setattr(alert_repository, "collection", FakeBulkActive(alerts, calls))
+    monkeypatch.setattr(alert_repository, "history_collection", FakeBulkHistory(calls))
+
+    res = await alert_repository.dismiss_alerts_bulk([str(oid), "custom-1", "missing"], "tester")
+
+    assert res == alerts
+    # One claim, one read back, one insert_many and one delete_many
+    assert [c[0] for c in calls] == ["update_many", "find", "insert_many", "delete_many"]
+    _, claim_query, claim_update = calls[0]
+    claim = claim_update["$set"]["dismissal_id"]
+    assert claim_query["$and"][0]["$or"][0] == {"_id": {"$in": [oid]}}
+    assert {"is_resolved": {"$ne": True}} in claim_query["$and"]
+    assert calls[1][1] == {"dismissal_id": claim}
+    _, docs, ordered = calls[2]
+    assert [doc["alert_id"] for doc in docs] == [str(oid), "legacy"]
+    assert ordered is False
+    assert calls[3][1] == {"_id": {"$in": [oid, "legacy"]}, "dismissal_id": claim}
+
+
+@pytest.mark.asyncio
+async def test_dismiss_alerts_bulk_partial_history_failure_keeps_failed_alerts(monkeypatch):
+    from pymongo.errors import BulkWriteError
+
+    alerts = [
+        {"_id": "a1", "type": "ph"},
+        {"_id": "a2", "type": "ph"},
+        {"_id": "a3", "type": "ph"},
+    ]
+    error = BulkWriteError({"writeErrors": [{"index": 1, "code": 11000, "errmsg": "dup"}]})
+    calls = []
+    monkeypatch.setattr(alert_repository, "collection", FakeBulkActive(alerts, calls))
+    monkeypatch.setattr(alert_repository, "history_collection", FakeBulkHistory(calls, error))
+
+    res = await alert_repository.dismiss_alerts_bulk(["a1", "a2", "a3"], "tester")
+
+    assert [a["_id"] for a in res] == ["a1", "a3"]
+    # The failed alert is released, only the archived ones are deleted
+    release = [c for c in calls if c[0] == "update_many"][1]
+    assert release[1]["_id"] == {"$in": ["a2"]}
+    delete = [c for c in calls if c[0] == "delete_many"][0]
+    assert delete[1]["_id"] == {"$in": ["a1", "a3"]}
+
+
+@pytest.mark.asyncio
+async def test_service_dismiss_alerts_bulk_splits_dismissed_and_not_found():
+    from bson import ObjectId
+    from app.services.alert_service import AlertService
+
+    oid = ObjectId()
+
+    class FakeRepo:
+        async def dismiss_alerts_bulk(self, alert_ids, dismissed_by, dismissed_at=None, reason=None):
+            # Matched once by _id and once by the custom id field
+            return [{"_id": oid, "type": "ph"}, {"_id": ObjectId(), "id": "custom-1", "type": "ph"}]
+
+    service = AlertService(alert_repo=FakeRepo())
+    res = await service.dismiss_alerts_bulk([str(oid), "custom-1", "missing"], "tester@example.com")
+
+    assert res["dismissed"] == [str(oid), "custom-1"]
+    assert res["not_found"] == ["missing"]
+    assert res["dismissed_by"] == "tester@example.com"
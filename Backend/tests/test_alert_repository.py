@@ -44,3 +44,37 @@ async def test_create_measurement_alert_inserts_when_connected_and_no_existing(m
 
     res = await alert_repository.create_alert(alert_doc)
     assert res == "inserted-nonmeas-id"
+
+
+@pytest.mark.asyncio
+async def test_iter_alerts_history_yields_cursor_documents(monkeypatch):
+    """History is yielded document by document from one sorted, limited cursor."""
+    docs = [{"_id": "h2"}, {"_id": "h1"}]
+    calls = {}
+
+    class FakeCursor:
+        def sort(self, key, direction):
+            calls["sort"] = (key, direction)
+            return self
+
+        def limit(self, n):
+            calls["limit"] = n
+            return self
+
+        async def __aiter__(self):
+            for doc in docs:
+                yield doc
+
+    class FakeHistory:
+        def find(self, query, projection):
+            calls["query"] = query
+            return FakeCursor()
+
+    monkeypatch.setattr(alert_repository, "history_collection", FakeHistory())
+
+    seen = [doc async for doc in alert_repository.iter_alerts_history(days=7, limit=2)]
+
+    assert seen == docs
+    assert calls["sort"] == ("created_at", -1)
+    assert calls["limit"] == 2
+    assert "$gte" in calls["query"]["created_at"]
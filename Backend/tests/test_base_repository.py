@@ -33,3 +33,81 @@ def test_insert_one_returns_string_id(monkeypatch):
     loop = asyncio.get_event_loop()
     out = loop.run_until_complete(run())
     assert out == "oid-xyz"
+
+
+class DummyRedis:
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.store[key] = value
+
+
+def test_cached_read_serves_second_call_from_cache(monkeypatch):
+    from datetime import datetime
+    from bson import ObjectId
+    from app.repositories.base_repository import cached_read
+    from app.services.cache import cache_service
+
+    monkeypatch.setattr(cache_service, "redis_client", DummyRedis())
+    monkeypatch.setattr(cache_service, "enabled", True)
+
+    calls = []
+    doc = {"_id": ObjectId(), "ProcessedAt": datetime(2024, 1, 1, 12, 0)}
+
+    class Repo:
+        @cached_read("sensor_data", ttl=30)
+        async def read(self, sensor_id, limit=10):
+            calls.append(sensor_id)
+            return [doc]
+
+    import asyncio
+
+    async def run():
+        first = await Repo().read("S1", limit=5)
+        second = await Repo().read("S1", limit=5)
+        return first, second
+
+    loop = asyncio.get_event_loop()
+    first, second = loop.run_until_complete(run())
+    assert calls == ["S1"]
+    # BSON round-trip keeps ObjectId/datetime types
+    assert second == first
+    assert all(key.startswith("sensor_data:") for key in cache_service.redis_client.store)
+
+
+def test_cached_read_does_not_cache_failed_reads(monkeypatch):
+    from app.repositories.base_repository import cached_read
+    from app.services.cache import cache_service
+
+    redis = DummyRedis()
+    monkeypatch.setattr(cache_service, "redis_client", redis)
+    monkeypatch.setattr(cache_service, "enabled", True)
+
+    calls = []
+
+    class Repo:
+        @cached_read("sensor_data", ttl=30, on_error=list)
+        async def read(self, sensor_id):
+            calls.append(sensor_id)
+            if len(calls) == 1:
+                raise RuntimeError("database down")
+            return [{"SensorID": sensor_id}]
+
+    import asyncio
+
+    async def run():
+        first = await Repo().read("S1")
+        second = await Repo().read("S1")
+        return first, second
+
+    loop = asyncio.get_event_loop()
+    first, second = loop.run_until_complete(run())
+    # The fallback is returned but not stored, so the next call hits the database
+    assert first == []
+    assert second == [{"SensorID": "S1"}]
+    assert calls == ["S1", "S1"]
+    assert len(redis.store) == 1
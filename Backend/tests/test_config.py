@@ -0,0 +1,39 @@
+"""
+Tests for configuration module
+Guards against duplicated settings declarations and database init regressions
+"""
+
+import ast
+import importlib
+import inspect
+from pathlib import Path
+
+from app.config.database import Database
+
+# app.config re-exports the `settings` instance under the submodule's name
+settings_module = importlib.import_module("app.config.settings")
+
+
+def test_settings_fields_declared_once():
+    """Each Settings field must be declared exactly once in the class body"""
+    source = Path(settings_module.__file__).read_text(encoding="utf-8")
+    tree = ast.parse(source)
+    settings_class = next(
+        node for node in tree.body
+        if isinstance(node, ast.ClassDef) and node.name == "Settings"
+    )
+
+    names = [
+        node.target.id
+        for node in settings_class.body
+        if isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name)
+    ]
+
+    duplicates = {name for name in names if names.count(name) > 1}
+    assert not duplicates
+    assert set(names) == set(settings_module.Settings.model_fields)
+
+
+def test_database_initialize_is_async():
+    """Database.initialize must be the async variant"""
+    assert inspect.iscoroutinefunction(Database.initialize)
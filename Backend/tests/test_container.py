@@ -0,0 +1,27 @@
+from app.core.container import Container, get_container, reset_container
+
+
+class IThing:
+    pass
+
+
+def test_containers_are_independent_instances():
+    first = Container()
+    first.register_singleton(IThing, instance=object())
+
+    assert not Container().is_registered(IThing)
+
+
+def test_reset_container_gives_fresh_instance():
+    reset_container()
+    container = get_container()
+    container.register_singleton(IThing, instance=object())
+    container.freeze()
+
+    reset_container()
+    fresh = get_container()
+
+    assert fresh is not container
+    assert not fresh.is_frozen
+    assert not fresh.is_registered(IThing)
+    reset_container()
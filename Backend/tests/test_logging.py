@@ -0,0 +1,35 @@
+import io
+import json
+import logging
+import logging.handlers
+import queue
+
+from app.utils.logging import ContextQueueHandler, JSONFormatter, request_id_var
+
+
+def test_queued_json_record_keeps_exception_and_request_id():
+    stream = io.StringIO()
+    target = logging.StreamHandler(stream)
+    target.setFormatter(JSONFormatter())
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, target)
+
+    logger = logging.getLogger("tests.queue_logging")
+    logger.propagate = False
+    logger.addHandler(ContextQueueHandler(log_queue))
+    token = request_id_var.set("req-123")
+    listener.start()
+    try:
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed with %s", "args")
+    finally:
+        listener.stop()
+        request_id_var.reset(token)
+        logger.handlers.clear()
+
+    data = json.loads(stream.getvalue())
+    assert data["message"] == "failed with args"
+    assert data["request_id"] == "req-123"
+    assert "ValueError: boom" in data["exception"]
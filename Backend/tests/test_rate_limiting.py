@@ -4,13 +4,12 @@ Tests for rate limiting middleware
 Tests role-based limits, critical endpoints, and rate limit headers
 """
 
+import asyncio
 import pytest
-from datetime import datetime, timedelta
-from unittest.mock import Mock, patch
-from fastapi import Request, Response
-from fastapi.responses import JSONResponse
+import time
+from unittest.mock import AsyncMock, Mock, patch
 
-from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware, _TokenInfo, _token_key
 
 
 # ============================================
@@ -41,8 +40,8 @@ class TestRateLimitConfiguration:
         middleware = RateLimitMiddleware(app_mock)
         
         assert "/api/token" in middleware.CRITICAL_ENDPOINTS
-        assert "/api/forgot-password" in middleware.CRITICAL_ENDPOINTS
-        assert "/api/reset-password" in middleware.CRITICAL_ENDPOINTS
+        assert "/api/auth/forgot-password" in middleware.CRITICAL_ENDPOINTS
+        assert "/api/auth/reset-password" in middleware.CRITICAL_ENDPOINTS
         # /api/users is handled via _is_critical_endpoint() for POST only
         assert middleware._is_critical_endpoint("/api/users", "POST") is True
     
@@ -92,14 +91,14 @@ class TestCriticalEndpointDetection:
         app_mock = Mock()
         middleware = RateLimitMiddleware(app_mock)
         
-        assert middleware._is_critical_endpoint("/api/forgot-password", "POST") is True
+        assert middleware._is_critical_endpoint("/api/auth/forgot-password", "POST") is True
     
     def test_is_critical_endpoint_reset_password(self):
         """Test: reset-password es crítico"""
         app_mock = Mock()
         middleware = RateLimitMiddleware(app_mock)
         
-        assert middleware._is_critical_endpoint("/api/reset-password", "POST") is True
+        assert middleware._is_critical_endpoint("/api/auth/reset-password", "POST") is True
     
     def test_is_critical_endpoint_users_post(self):
         """Test: POST /api/users es crítico (crear usuario)"""
@@ -126,64 +125,85 @@ class TestCriticalEndpointDetection:
 
 
 # ============================================
-# REQUEST CLEANING TESTS
+# TOKEN BUCKET TESTS
 # ============================================
 
-class TestRequestCleaning:
-    """Tests para limpieza de requests antiguos"""
+def _seed(middleware, key, capacity, window, when, tokens=None):
+    """Registra un bucket como si una petición admitida lo hubiera usado"""
+    kind, ident = key.split(":", 1)
+    bucket = middleware._refill(kind, ident, capacity, capacity / window, when)
+    if tokens is not None:
+        bucket.tokens = tokens + 1
+    middleware._take(kind, ident, bucket)
+    return bucket
+
+
+class TestTokenBuckets:
+    """Tests para los token buckets"""
     
-    def test_clean_old_requests(self):
-        """Test: eliminar requests fuera de ventana de tiempo"""
+    def test_new_bucket_starts_full(self):
+        """Test: un bucket nuevo parte con capacidad completa"""
         app_mock = Mock()
         middleware = RateLimitMiddleware(app_mock)
         
-        now = datetime.utcnow()
-        old_time = now - timedelta(minutes=5)
-        recent_time = now - timedelta(seconds=30)
-        
-        requests_list = [
-            (old_time, "/api/test1"),
-            (recent_time, "/api/test2"),
-            (now, "/api/test3")
-        ]
-        
-        # Limpiar requests más antiguos de 1 minuto
-        cleaned = middleware._clean_old_requests(requests_list, timedelta(minutes=1))
+        bucket = middleware._refill("ip", "1.2.3.4", 5, 5 / 60.0, time.monotonic())
         
-        # Solo deben quedar los requests recientes
-        assert len(cleaned) == 2
-        assert cleaned[0][1] == "/api/test2"
-        assert cleaned[1][1] == "/api/test3"
+        assert bucket.tokens == 5
+        # No se guarda hasta que una petición lo consume
+        assert "1.2.3.4" not in middleware.buckets["ip"]
     
-    def test_clean_all_old_requests(self):
-        """Test: todos los requests son antiguos"""
+    def test_bucket_refills_over_time(self):
+        """Test: tokens se recuperan según la tasa, sin exceder la capacidad"""
         app_mock = Mock()
         middleware = RateLimitMiddleware(app_mock)
         
-        old_time = datetime.utcnow() - timedelta(hours=2)
-        requests_list = [
-            (old_time, "/api/test1"),
-            (old_time, "/api/test2")
-        ]
+        now = time.monotonic()
+        _seed(middleware, "ip:1.2.3.4", 5, 60.0, now - 30, tokens=0.0)
         
-        cleaned = middleware._clean_old_requests(requests_list, timedelta(minutes=1))
+        # 30s a 5 tokens/min = 2.5 tokens
+        bucket = middleware._refill("ip", "1.2.3.4", 5, 5 / 60.0, now)
+        assert bucket.tokens == pytest.approx(2.5)
         
-        assert len(cleaned) == 0
+        # Una hora después el bucket está lleno, no por encima
+        bucket = middleware._refill("ip", "1.2.3.4", 5, 5 / 60.0, now + 3600)
+        assert bucket.tokens == 5
     
-    def test_clean_no_old_requests(self):
-        """Test: ningún request es antiguo"""
+    def test_bucket_store_is_capped(self):
+        """Test: al superar el máximo se descarta el bucket usado hace más tiempo"""
         app_mock = Mock()
         middleware = RateLimitMiddleware(app_mock)
         
-        now = datetime.utcnow()
-        requests_list = [
-            (now, "/api/test1"),
-            (now, "/api/test2")
-        ]
+        now = time.monotonic()
+        with patch("app.middleware.rate_limit.MAX_BUCKETS_PER_KIND", 2):
+            _seed(middleware, "ip:a", 100, 60.0, now)
+            _seed(middleware, "ip:b", 100, 60.0, now + 1)
+            _seed(middleware, "ip:a", 100, 60.0, now + 2)
+            _seed(middleware, "ip:c", 100, 60.0, now + 3)
         
-        cleaned = middleware._clean_old_requests(requests_list, timedelta(minutes=1))
+        assert list(middleware.buckets["ip"]) == ["a", "c"]
+    
+    def test_prune_drops_idle_buckets(self):
+        """Test: buckets inactivos y tokens vencidos se eliminan"""
+        app_mock = Mock()
+        middleware = RateLimitMiddleware(app_mock)
         
-        assert len(cleaned) == 2
+        now = time.monotonic()
+        _seed(middleware, "ip:back", 100, 60.0, now - 7200)
+        _seed(middleware, "ip:old", 100, 60.0, now - 7200)
+        _seed(middleware, "ip:new", 100, 60.0, now)
+        # Volver a usarlo lo mueve al final del orden de uso
+        _seed(middleware, "ip:back", 100, 60.0, now)
+        middleware._token_cache[b"expired"] = _TokenInfo("a@example.com", "usuario", time.time() - 1)
+        middleware._token_cache[b"valid"] = _TokenInfo("b@example.com", "usuario", time.time() + 600)
+        middleware._last_prune = now - 120
+        
+        middleware._prune_idle(now)
+        
+        assert "old" not in middleware.buckets["ip"]
+        assert "new" in middleware.buckets["ip"]
+        assert "back" in middleware.buckets["ip"]
+        assert list(middleware._token_cache) == [b"valid"]
+        assert middleware.get_stats()["active_ips"] == 2
 
 
 # ============================================
@@ -205,10 +225,9 @@ class TestUserTokenExtraction:
             "role": "usuario"
         }
         
-        request_mock = Mock()
-        request_mock.headers.get.return_value = "Bearer valid_token_here"
+        auth_header = "Bearer valid_token_here"
         
-        email, role = middleware._get_user_from_token(request_mock)
+        email, role = middleware._get_user_from_token(auth_header)
         
         assert email == "test@example.com"
         assert role == "usuario"
@@ -218,10 +237,9 @@ class TestUserTokenExtraction:
         app_mock = Mock()
         middleware = RateLimitMiddleware(app_mock)
         
-        request_mock = Mock()
-        request_mock.headers.get.return_value = None
+        auth_header = None
         
-        email, role = middleware._get_user_from_token(request_mock)
+        email, role = middleware._get_user_from_token(auth_header)
         
         assert email is None
         assert role is None
@@ -231,14 +249,34 @@ class TestUserTokenExtraction:
         app_mock = Mock()
         middleware = RateLimitMiddleware(app_mock)
         
-        request_mock = Mock()
-        request_mock.headers.get.return_value = "InvalidTokenFormat"
+        auth_header = "InvalidTokenFormat"
         
-        email, role = middleware._get_user_from_token(request_mock)
+        email, role = middleware._get_user_from_token(auth_header)
         
         assert email is None
         assert role is None
     
+    @patch('app.middleware.rate_limit.jwt.decode')
+    def test_decoded_token_is_cached_until_exp(self, mock_jwt_decode):
+        """Test: el token decodificado se reutiliza hasta su expiración"""
+        app_mock = Mock()
+        middleware = RateLimitMiddleware(app_mock)
+        
+        mock_jwt_decode.return_value = {
+            "sub": "user@example.com",
+            "role": "operario",
+            "exp": time.time() + 600
+        }
+        
+        for _ in range(3):
+            assert middleware._get_user_from_token("Bearer cached_token") == ("user@example.com", "operario")
+        assert mock_jwt_decode.call_count == 1
+        
+        # Entrada vencida: se vuelve a decodificar
+        middleware._token_cache[_token_key(b"cached_token")] = _TokenInfo("user@example.com", "operario", time.time() - 1)
+        middleware._get_user_from_token("Bearer cached_token")
+        assert mock_jwt_decode.call_count == 2
+    
     @patch('app.middleware.rate_limit.jwt.decode')
     def test_get_user_from_expired_token(self, mock_jwt_decode):
         """Test: token expirado retorna None"""
@@ -248,10 +286,9 @@ class TestUserTokenExtraction:
         # Simular token expirado
         mock_jwt_decode.side_effect = Exception("Token expired")
         
-        request_mock = Mock()
-        request_mock.headers.get.return_value = "Bearer expired_token"
+        auth_header = "Bearer expired_token"
         
-        email, role = middleware._get_user_from_token(request_mock)
+        email, role = middleware._get_user_from_token(auth_header)
         
         assert email is None
         assert role is None
@@ -282,18 +319,19 @@ class TestRateLimitStatistics:
         app_mock = Mock()
         middleware = RateLimitMiddleware(app_mock)
         
-        # Simular algunos requests
-        now = datetime.utcnow()
-        middleware.ip_requests["192.168.1.1"] = [(now, "/api/test")]
-        middleware.ip_requests["192.168.1.2"] = [(now, "/api/test2")]
-        middleware.user_requests["user@test.com"] = [(now, "/api/test", "usuario")]
+        # Simular algunos buckets
+        now = time.monotonic()
+        _seed(middleware, "ip:192.168.1.1", 100, 60.0, now)
+        _seed(middleware, "ip:192.168.1.2", 100, 60.0, now)
+        _seed(middleware, "crit:192.168.1.2", 5, 60.0, now)
+        _seed(middleware, "user:user@test.com", 10000, 3600.0, now)
+        _seed(middleware, "ip:192.168.1.1", 100, 60.0, now)
         
         stats = middleware.get_stats()
         
         assert stats["active_ips"] == 2
         assert stats["active_users"] == 1
-        assert stats["total_ip_requests"] == 2
-        assert stats["total_user_requests"] == 1
+        assert stats["active_buckets"] == 4
     
     def test_get_stats_rate_limits_info(self):
         """Test: estadísticas incluyen info de límites"""
@@ -310,6 +348,92 @@ class TestRateLimitStatistics:
         assert stats["rate_limits"]["hourly_limit"] == "10000/hour"
 
 
+def _http_scope(path, method="GET", headers=None, client=("127.0.0.1", 50000)):
+    """Scope ASGI mínimo para una petición HTTP"""
+    return {
+        "type": "http",
+        "path": path,
+        "method": method,
+        "headers": headers or [],
+        "client": client,
+    }
+
+
+async def _ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"OK"})
+
+
+class _FakePipeline:
+    """Pipeline en memoria con los comandos Redis que usa el rate limiter"""
+    
+    def __init__(self, counts, logs):
+        self.counts = counts
+        self.logs = logs
+        self.ops = []
+    
+    def incr(self, key):
+        self.ops.append(("incr", key))
+    
+    def expire(self, key, seconds, nx=False):
+        self.ops.append(("expire", key))
+    
+    def get(self, key):
+        self.ops.append(("get", key))
+    
+    def zremrangebyscore(self, key, low, high):
+        self.ops.append(("zrem", (key, high)))
+    
+    def zadd(self, key, mapping):
+        self.ops.append(("zadd", (key, mapping)))
+    
+    def zremrangebyrank(self, key, start, stop):
+        self.ops.append(("zremrank", (key, stop)))
+    
+    def zcard(self, key):
+        self.ops.append(("zcard", key))
+    
+    async def execute(self):
+        results = []
+        for op, key in self.ops:
+            if op == "incr":
+                self.counts[key] = self.counts.get(key, 0) + 1
+                results.append(self.counts[key])
+            elif op == "get":
+                results.append(self.counts.get(key))
+            elif op == "zrem":
+                name, high = key
+                entries = self.logs.setdefault(name, {})
+                for member in [m for m, score in entries.items() if score <= high]:
+                    del entries[member]
+                results.append(0)
+            elif op == "zadd":
+                name, mapping = key
+                self.logs.setdefault(name, {}).update(mapping)
+                results.append(1)
+            elif op == "zremrank":
+                name, stop = key
+                entries = self.logs.setdefault(name, {})
+                ordered = sorted(entries, key=entries.get)
+                for member in ordered[:max(0, len(ordered) + stop + 1)]:
+                    del entries[member]
+                results.append(0)
+            elif op == "zcard":
+                results.append(len(self.logs.get(key, {})))
+            else:
+                results.append(True)
+        return results
+
+
+def _fake_redis(counts=None):
+    """Cliente Redis falso; devuelve (cliente, contadores, sorted sets)"""
+    counts = {} if counts is None else counts
+    logs = {}
+    redis_mock = Mock()
+    redis_mock.pipeline.side_effect = lambda transaction=False: _FakePipeline(counts, logs)
+    return redis_mock, counts, logs
+
+
 # ============================================
 # EXCLUDED PATHS TESTS
 # ============================================
@@ -320,55 +444,43 @@ class TestExcludedPaths:
     @pytest.mark.asyncio
     async def test_health_endpoint_excluded(self):
         """Test: /health excluido de rate limiting"""
-        app_mock = Mock()
+        app_mock = AsyncMock()
         middleware = RateLimitMiddleware(app_mock)
+        receive, send = AsyncMock(), AsyncMock()
         
-        request_mock = Mock(spec=Request)
-        request_mock.url.path = "/health"
-        request_mock.client.host = "127.0.0.1"
-        
-        call_next_mock = Mock()
-        call_next_mock.return_value = Response(content="OK", status_code=200)
+        scope = _http_scope("/health")
         
         # No debe aplicar rate limiting
-        response = await middleware.dispatch(request_mock, call_next_mock)
+        await middleware(scope, receive, send)
         
-        # call_next debe ser llamado directamente
-        call_next_mock.assert_called_once()
+        # La app interna debe recibir el send original
+        app_mock.assert_awaited_once_with(scope, receive, send)
     
     @pytest.mark.asyncio
     async def test_root_endpoint_excluded(self):
         """Test: / excluido de rate limiting"""
-        app_mock = Mock()
+        app_mock = AsyncMock()
         middleware = RateLimitMiddleware(app_mock)
+        receive, send = AsyncMock(), AsyncMock()
         
-        request_mock = Mock(spec=Request)
-        request_mock.url.path = "/"
-        request_mock.client.host = "127.0.0.1"
+        scope = _http_scope("/")
         
-        call_next_mock = Mock()
-        call_next_mock.return_value = Response(content="OK", status_code=200)
+        await middleware(scope, receive, send)
         
-        response = await middleware.dispatch(request_mock, call_next_mock)
-        
-        call_next_mock.assert_called_once()
+        app_mock.assert_awaited_once_with(scope, receive, send)
     
     @pytest.mark.asyncio
     async def test_websocket_excluded(self):
         """Test: /ws/* excluido de rate limiting"""
-        app_mock = Mock()
+        app_mock = AsyncMock()
         middleware = RateLimitMiddleware(app_mock)
+        receive, send = AsyncMock(), AsyncMock()
         
-        request_mock = Mock(spec=Request)
-        request_mock.url.path = "/ws/alerts"
-        request_mock.client.host = "127.0.0.1"
+        scope = _http_scope("/ws/alerts")
         
-        call_next_mock = Mock()
-        call_next_mock.return_value = Response(content="OK", status_code=200)
+        await middleware(scope, receive, send)
         
-        response = await middleware.dispatch(request_mock, call_next_mock)
-        
-        call_next_mock.assert_called_once()
+        app_mock.assert_awaited_once_with(scope, receive, send)
 
 
 # ============================================
@@ -378,6 +490,196 @@ class TestExcludedPaths:
 class TestRateLimitIntegration:
     """Tests de integración del rate limiting"""
     
+    @pytest.mark.asyncio
+    async def test_asgi_headers_and_429(self):
+        """Test: cabeceras X-RateLimit-* y 429 al agotar el límite crítico"""
+        middleware = RateLimitMiddleware(_ok_app)
+        
+        for attempt in range(middleware.CRITICAL_ENDPOINTS_LIMIT + 1):
+            messages = []
+            
+            async def send(message):
+                messages.append(message)
+            
+            await middleware(_http_scope("/api/token", method="POST"), AsyncMock(), send)
+            start = messages[0]
+            headers = dict(start["headers"])
+            
+            if attempt < middleware.CRITICAL_ENDPOINTS_LIMIT:
+                assert start["status"] == 200
+                assert headers[b"x-ratelimit-limit"] == b"100"
+            else:
+                assert start["status"] == 429
+                assert headers[b"retry-after"] == b"60"
+                assert b"retry_after" in messages[1]["body"]
+    
+    @pytest.mark.asyncio
+    async def test_repeated_rejections_logged_once_per_interval(self):
+        """Test: un cliente bloqueado se registra una vez por intervalo, no por solicitud"""
+        middleware = RateLimitMiddleware(_ok_app)
+        _seed(middleware, "crit:127.0.0.1", 5, 60.0, time.monotonic(), tokens=0.0)
+        
+        with patch("app.middleware.rate_limit.logger") as logger_mock:
+            logger_mock.isEnabledFor.return_value = True
+            for _ in range(20):
+                await middleware(_http_scope("/api/token", method="POST"), AsyncMock(), AsyncMock())
+        
+        assert logger_mock.warning.call_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_critical_limit_rejects_before_decoding_token(self):
+        """Test: sobre el límite crítico no se decodifica el JWT"""
+        middleware = RateLimitMiddleware(_ok_app)
+        _seed(middleware, "crit:127.0.0.1", 5, 60.0, time.monotonic(), tokens=0.0)
+        send = AsyncMock()
+        scope = _http_scope(
+            "/api/token", method="POST",
+            headers=[(b"authorization", b"Bearer some_token")]
+        )
+        
+        with patch.object(middleware, "_get_user_from_bearer") as token_mock:
+            await middleware(scope, AsyncMock(), send)
+        
+        token_mock.assert_not_called()
+        assert send.await_args_list[0].args[0]["status"] == 429
+    
+    @pytest.mark.asyncio
+    async def test_redis_counters_shared_when_connected(self):
+        """Test: con Redis conectado se usan contadores compartidos en Redis"""
+        redis_mock, _, logs = _fake_redis()
+        
+        # Dos workers comparten los mismos contadores
+        workers = [RateLimitMiddleware(_ok_app), RateLimitMiddleware(_ok_app)]
+        statuses = []
+        
+        with patch.object(RateLimitMiddleware, "_redis_client", return_value=redis_mock):
+            for attempt in range(workers[0].CRITICAL_ENDPOINTS_LIMIT + 1):
+                messages = []
+                
+                async def send(message):
+                    messages.append(message)
+                
+                await workers[attempt % 2](_http_scope("/api/token", method="POST"), AsyncMock(), send)
+                statuses.append(messages[0]["status"])
+        
+        assert statuses == [200] * workers[0].CRITICAL_ENDPOINTS_LIMIT + [429]
+        
+        # Los reintentos rechazados no se registran: el log no crece y el
+        # cliente no queda bloqueado más allá de la ventana
+        with patch.object(RateLimitMiddleware, "_redis_client", return_value=redis_mock):
+            for _ in range(20):
+                await workers[0](_http_scope("/api/token", method="POST"), AsyncMock(), AsyncMock())
+        assert len(logs["rl:crit:127.0.0.1"]) == workers[0].CRITICAL_ENDPOINTS_LIMIT
+        assert all(not any(worker.buckets.values()) for worker in workers)
+    
+    @pytest.mark.asyncio
+    async def test_redis_critical_retries_do_not_extend_lockout(self):
+        """Test: con Redis, reintentar un endpoint crítico no prolonga el bloqueo"""
+        middleware = RateLimitMiddleware(_ok_app)
+        redis_mock, _, _ = _fake_redis()
+        
+        async def status_at(wall):
+            messages = []
+            
+            async def send(message):
+                messages.append(message)
+            
+            with patch.object(RateLimitMiddleware, "_redis_client", return_value=redis_mock), \
+                 patch("app.middleware.rate_limit.time.time", return_value=wall):
+                await middleware(_http_scope("/api/token", method="POST"), AsyncMock(), send)
+            return messages[0]["status"]
+        
+        for _ in range(middleware.CRITICAL_ENDPOINTS_LIMIT):
+            assert await status_at(1000.0) == 200
+        # Reintentos rechazados durante todo el minuto
+        for second in range(1, 60, 5):
+            assert await status_at(1000.0 + second) == 429
+        # Pasada la ventana de los admitidos, el cliente vuelve a entrar
+        assert await status_at(1000.0 + 61) == 200
+    
+    @pytest.mark.asyncio
+    async def test_redis_rejection_charges_no_counter(self):
+        """Test: con Redis, una solicitud rechazada por el límite horario no suma al contador por IP"""
+        middleware = RateLimitMiddleware(_ok_app)
+        wall = 7200.0 + 30  # ventana por minuto 120, ventana por hora 2
+        redis_mock, counts, _ = _fake_redis({"rl:user:a@b.cl:2": middleware.USER_LIMIT_PER_HOUR})
+        send = AsyncMock()
+        scope = _http_scope("/api/sensors", headers=[(b"authorization", b"Bearer token")])
+        
+        with patch.object(RateLimitMiddleware, "_redis_client", return_value=redis_mock), \
+             patch.object(middleware, "_get_user_from_bearer", return_value=("a@b.cl", "operario")), \
+             patch("app.middleware.rate_limit.time.time", return_value=wall):
+            await middleware(scope, AsyncMock(), send)
+        
+        assert send.await_args_list[0].args[0]["status"] == 429
+        assert "rl:ip:127.0.0.1:120" not in counts
+        assert counts["rl:user:a@b.cl:2"] == middleware.USER_LIMIT_PER_HOUR
+    
+    @pytest.mark.asyncio
+    async def test_redis_sliding_window_weights_previous_window(self):
+        """Test: la ventana anterior cuenta en proporción a su solapamiento"""
+        middleware = RateLimitMiddleware(Mock())
+        wall = 6000.0 + 15  # 25% transcurrido de la ventana 100
+        redis_mock, counts, _ = _fake_redis({"rl:ip:1.2.3.4:99": 40})
+        
+        with patch("app.middleware.rate_limit.time.time", return_value=wall):
+            remaining = await middleware._redis_remaining(
+                redis_mock, [("ip", "1.2.3.4", 100, 60.0)]
+            )
+        
+        # 40 * 0.75 solicitudes efectivas; la consulta no cuenta la solicitud
+        assert remaining == [100 - 30]
+        assert "rl:ip:1.2.3.4:100" not in counts
+    
+    @pytest.mark.asyncio
+    async def test_shared_stats_scan_current_window(self):
+        """Test: las estadísticas compartidas cuentan las claves Redis de la ventana actual"""
+        middleware = RateLimitMiddleware(Mock())
+        wall = 7200.0 + 30  # ventana por minuto 120, ventana por hora 2
+        keys = ["rl:ip:1.1.1.1:120", "rl:ip:2.2.2.2:120", "rl:ip:3.3.3.3:119", "rl:user:a@b.cl:2"]
+        
+        async def scan_iter(match, count):
+            prefix, _, index = match.rpartition("*:")
+            for key in keys:
+                if key.startswith(prefix) and key.endswith(":" + index):
+                    yield key
+        
+        redis_mock = Mock()
+        redis_mock.scan_iter = scan_iter
+        
+        with patch.object(RateLimitMiddleware, "_redis_client", return_value=redis_mock), \
+                patch("app.middleware.rate_limit.time.time", return_value=wall):
+            stats = await middleware.get_shared_stats()
+        
+        assert stats == {"active_ips": 2, "active_users": 1}
+        
+        # Sin Redis no hay estadísticas compartidas
+        with patch.object(RateLimitMiddleware, "_redis_client", return_value=None):
+            assert await middleware.get_shared_stats() is None
+    
+    @pytest.mark.asyncio
+    async def test_sweeper_runs_for_lifespan(self):
+        """Test: el barrido de estado inactivo vive durante el lifespan de la app"""
+        messages = iter([{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+        seen = []
+        
+        async def receive():
+            return next(messages)
+        
+        async def lifespan_app(scope, receive, send):
+            await receive()
+            seen.append(middleware._sweeper)
+            await receive()
+        
+        middleware = RateLimitMiddleware(lifespan_app)
+        await middleware({"type": "lifespan"}, receive, AsyncMock())
+        
+        sweeper = seen[0]
+        assert sweeper is not None
+        assert middleware._sweeper is None
+        await asyncio.sleep(0)
+        assert sweeper.cancelled()
+    
     def test_role_based_limits_hierarchy(self):
         """Test: jerarquía de límites por rol"""
         app_mock = Mock()
@@ -0,0 +1,45 @@
+"""
+Tests for sensor request models
+"""
+
+import pytest
+from pydantic import ValidationError
+
+from app.models.sensor_models import PredictionRequest, SensorReading
+
+
+@pytest.mark.parametrize("sensor_type", ["ph", "temperature", "conductivity", "water_level"])
+def test_prediction_request_accepts_known_sensor_types(sensor_type):
+    request = PredictionRequest(sensor_type=sensor_type, days=3, lookback_days=14)
+    assert request.sensor_type == sensor_type
+
+
+@pytest.mark.parametrize("sensor_type", ["", "PH", "ph ", "humidity", "ph|temperature"])
+def test_prediction_request_rejects_unknown_sensor_types(sensor_type):
+    with pytest.raises(ValidationError):
+        PredictionRequest(sensor_type=sensor_type, days=3, lookback_days=14)
+
+
+@pytest.mark.parametrize("field, value, message", [
+    ("temperature", 55, "Temperature out of operational range: 55.0°C (expected: -10 to 50°C)"),
+    ("temperature", -11, "Temperature out of operational range: -11.0°C (expected: -10 to 50°C)"),
+    ("ph", 2.5, "pH out of operational range: 2.5 (expected: 3 to 10)"),
+    ("ec", 12, "Conductivity out of operational range: 12.0 dS/m (expected: 0 to 10)"),
+])
+def test_sensor_reading_out_of_range_reports_operational_range(field, value, message):
+    reading = {"temperature": 22.5, "ph": 5.3, "ec": 0.8, "water_level": 75.0, field: value}
+    with pytest.raises(ValidationError) as exc_info:
+        SensorReading(**reading)
+    errors = exc_info.value.errors()
+    assert len(errors) == 1
+    assert errors[0]["loc"] == (field,)
+    assert errors[0]["type"] == "value_error"
+    assert message in errors[0]["msg"]
+
+
+def test_sensor_reading_keeps_other_validation_errors():
+    with pytest.raises(ValidationError) as exc_info:
+        SensorReading(temperature=22.5, ph=5.3, ec=0.8, water_level=150, reservoir_id="  ")
+    errors = {error["loc"][0]: error for error in exc_info.value.errors()}
+    assert errors["water_level"]["type"] == "less_than_equal"
+    assert "reservoir_id cannot be empty" in errors["reservoir_id"]["msg"]
@@ -0,0 +1,129 @@
+"""
+Tests for the core validators
+"""
+
+import math
+import subprocess
+import sys
+
+import pytest
+
+from app.core.validators import SensorValidator
+
+
+def test_validators_import_does_not_load_numpy():
+    """NumPy is only loaded by the batch validator, not by importing the module"""
+    code = "import sys, app.core.validators; print('numpy' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_sensor_readings_batch_all_valid():
+    readings = [
+        {"ph": 7.0, "temperature": 20, "ec": 1.5, "water_level": 50},
+        {"ph": "6.5", "temperature": 18.5, "ec": 0, "water_level": 100},
+    ]
+    result = SensorValidator.validate_sensor_readings_batch(readings)
+
+    assert list(result["invalid_indices"]) == []
+    assert list(result["ph"]) == [7.0, 6.5]
+    assert list(result["water_level"]) == [50.0, 100.0]
+
+
+def test_sensor_readings_batch_flags_invalid_rows():
+    readings = [
+        {"ph": 7.0},
+        {"ph": 15},                    # out of range
+        "not a dict",
+        {"temperature": "hot"},        # not numeric
+        {"ec": -1},                    # out of range
+        {"water_level": 80},
+    ]
+    result = SensorValidator.validate_sensor_readings_batch(readings)
+
+    assert list(result["invalid_indices"]) == [1, 2, 3, 4]
+    assert list(result["water_level"][1:]) == [80.0]
+
+
+def test_sensor_readings_batch_missing_fields_are_nan():
+    result = SensorValidator.validate_sensor_readings_batch([{"ph": 7.0}, {}])
+
+    assert list(result["invalid_indices"]) == []
+    assert result["ph"][0] == 7.0
+    assert math.isnan(result["ph"][1])
+    assert all(math.isnan(value) for value in result["temperature"])
+
+
+def _load_validators(monkeypatch, re2_module):
+    """Fresh copy of the validators module with re2 installed or missing"""
+    import importlib.util
+    import app.core.validators as validators
+
+    # None in sys.modules makes `import re2` raise ImportError
+    monkeypatch.setitem(sys.modules, "re2", re2_module)
+    spec = importlib.util.spec_from_file_location("validators_under_test", validators.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_validators_fall_back_to_stdlib_re(monkeypatch):
+    import re
+
+    module = _load_validators(monkeypatch, None)
+
+    assert module.RE2_AVAILABLE is False
+    assert module._regex is re
+    assert module.BaseValidator.validate_email(" User@Example.COM ") == "user@example.com"
+
+
+def test_validators_select_re2_backend_when_importable(monkeypatch):
+    """Backend selection only: the stand-in module wraps stdlib re"""
+    import re
+    import types
+
+    compiled = []
+
+    def compile(pattern):
+        compiled.append(pattern)
+        return re.compile(pattern)
+
+    fake_re2 = types.ModuleType("re2")
+    fake_re2.compile = compile
+    module = _load_validators(monkeypatch, fake_re2)
+
+    assert module.RE2_AVAILABLE is True
+    assert module._regex is fake_re2
+    assert module._EMAIL_RE.pattern in compiled
+    assert module.BaseValidator.validate_emails_batch(["a@b.co", "bad"]) == [True, False]
+
+
+def test_validators_patterns_under_real_re2(monkeypatch):
+    re2 = pytest.importorskip("re2")
+    module = _load_validators(monkeypatch, re2)
+
+    assert module._regex is re2
+    assert module.BaseValidator.validate_emails_batch(["user@example.com", "bad", "a@b.c"]) == [True, False, False]
+    assert module.BaseValidator.validate_phone("+56 9 1234-5678") == "+56912345678"
+    assert module.SensorValidator.validate_sensor_id("sensor_01-A") == "sensor_01-A"
+
+
+def test_validate_emails_batch_matches_validate_email():
+    from app.core.validators import BaseValidator
+
+    emails = ["user@example.com", " Mixed@Case.Org ", "", "no-at-sign", "a@b.c", "x@y.io"]
+    assert BaseValidator.validate_emails_batch(emails) == [True, True, False, False, False, True]
+
+
+def test_threshold_config_dispatches_to_subclass_overrides():
+    from app.core.validators import AlertConfigValidator
+
+    seen = []
+
+    class StrictValidator(AlertConfigValidator):
+        @classmethod
+        def _validate_ph_threshold(cls, threshold):
+            seen.append((cls, threshold))
+
+    StrictValidator.validate_threshold_config({"ph": {"min": 6, "max": 8}, "unknown": {}})
+    assert seen == [(StrictValidator, {"min": 6, "max": 8})]